@@ -2,12 +2,20 @@
 Cache Manager
 
 Handles caching of VEP analysis results for faster subsequent runs.
-Stores raw VEP analysis only (no scores) to allow score recalibration.
+The VEP analysis cache is written as zstd-compressed Parquet when pyarrow is
+installed (columnar decode on load), with pickle as the fallback format.
+
+Only the columns scoring adds are kept in a pickle sidecar, tagged with the
+scoring fingerprint: warm runs with unchanged scoring code and configuration
+reattach them instead of rescoring, and any change triggers a recalibration
+from the cached analysis.
 """
 
 import pandas as pd
 from pathlib import Path
 
+from utils.data_utils import PYARROW_AVAILABLE
+
 
 class CacheManager:
     """Manages caching of VEP analysis results"""
@@ -17,9 +25,19 @@ class CacheManager:
         Initialize cache manager
         
         Args:
-            cache_file: Path to cache file (pickle format)
+            cache_file: Path to cache file (pickle format); the Parquet cache
+                sits next to it with a .parquet suffix and the scored results
+                with a .scores.pkl suffix
         """
         self.cache_file = Path(cache_file) if cache_file else None
+        self.parquet_file = self.cache_file.with_suffix('.parquet') if cache_file else None
+        self.scores_file = self.cache_file.with_suffix('.scores.pkl') if cache_file else None
+    
+    def _readable_cache_file(self):
+        """Cache file to load: Parquet when present and readable, else the pickle file"""
+        if PYARROW_AVAILABLE and self.parquet_file.exists():
+            return self.parquet_file
+        return self.cache_file
     
     def should_use_cache(self, force_recalculate=False):
         """
@@ -37,7 +55,7 @@ class CacheManager:
         if not self.cache_file:
             return False
             
-        return self.cache_file.exists()
+        return self._readable_cache_file().exists()
     
     def load_cache(self):
         """
@@ -49,13 +67,17 @@ class CacheManager:
         Raises:
             Exception: If cache cannot be loaded
         """
-        if not self.cache_file or not self.cache_file.exists():
+        cache_file = self._readable_cache_file() if self.cache_file else None
+        if not cache_file or not cache_file.exists():
             raise ValueError("Cache file does not exist")
         
-        print(f"Loading cached VEP analysis from: {self.cache_file}")
+        print(f"Loading cached VEP analysis from: {cache_file}")
         
         try:
-            cached_vep_analysis = pd.read_pickle(self.cache_file)
+            if cache_file == self.parquet_file:
+                cached_vep_analysis = pd.read_parquet(cache_file, engine='pyarrow')
+            else:
+                cached_vep_analysis = pd.read_pickle(cache_file)
             print(f"Loaded {len(cached_vep_analysis):,} cached VEP analyses")
             return cached_vep_analysis
         except Exception as e:
@@ -71,8 +93,68 @@ class CacheManager:
         if not self.cache_file:
             return
         
+        # Scores derived from the previous analysis are stale now
+        self.scores_file.unlink(missing_ok=True)
+        
+        if PYARROW_AVAILABLE:
+            try:
+                vep_analysis_df.to_parquet(self.parquet_file, engine='pyarrow', compression='zstd', index=False)
+                self.cache_file.unlink(missing_ok=True)  # Drop a stale pickle cache
+                print(f"✓ Cached VEP analysis saved to: {self.parquet_file}")
+                return
+            except Exception as e:
+                # Mixed-type object columns cannot be stored as Arrow: fall back to pickle
+                self.parquet_file.unlink(missing_ok=True)
+                print(f"Warning: Could not save Parquet cache ({e}), using pickle")
+        
         try:
             vep_analysis_df.to_pickle(self.cache_file)
+            self.parquet_file.unlink(missing_ok=True)  # Drop a stale Parquet cache
             print(f"✓ Cached VEP analysis saved to: {self.cache_file}")
         except Exception as e:
             print(f"Warning: Could not save cache file ({e})")
+    
+    def load_scores(self, fingerprint):
+        """
+        Load the cached score columns if they were computed with the given fingerprint
+        
+        Args:
+            fingerprint: Current scoring fingerprint (scoring_fingerprint())
+            
+        Returns:
+            pd.DataFrame or None: Cached score columns, None when missing, stale or unreadable
+        """
+        if not self.scores_file or not self.scores_file.exists():
+            return None
+        
+        try:
+            cached = pd.read_pickle(self.scores_file)
+        except Exception as e:
+            print(f"Warning: Could not load scores cache ({e}), rescoring...")
+            return None
+        
+        if cached.get('fingerprint') != fingerprint:
+            return None
+        
+        print(f"Loading cached priority scores from: {self.scores_file}")
+        return cached['scores']
+    
+    def save_scores(self, score_columns, fingerprint):
+        """
+        Save the score columns together with the scoring fingerprint they were computed with
+        
+        Pickle round-trips the Categorical and int8 dtypes exactly.
+        
+        Args:
+            score_columns: Columns the clinical scorer added (ClinicalScorer.extract_score_columns)
+            fingerprint: Scoring fingerprint (scoring_fingerprint())
+        """
+        if not self.scores_file:
+            return
+        
+        try:
+            pd.to_pickle({'fingerprint': fingerprint, 'scores': score_columns}, self.scores_file)
+            print(f"✓ Cached priority scores saved to: {self.scores_file}")
+        except Exception as e:
+            self.scores_file.unlink(missing_ok=True)
+            print(f"Warning: Could not save scores cache ({e})")
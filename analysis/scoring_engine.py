@@ -3,33 +3,236 @@ Clinical Scoring Engine
 
 Calculates priority scores with clinical evidence-first approach:
 - Clinical significance changes get highest priority
-- Impact transitions are functionally significant  
+- Impact transitions are functionally significant
 - VEP consequence mismatches get reduced weight (annotation noise)
+
+Scoring is vectorized: each scoring rule becomes a boolean component column,
+and the weighted sum plus clinical override is computed by a numeric kernel
+(JIT-compiled with Numba when available).
 """
 
+import ast
+import hashlib
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
 from config.scoring_config import (
     BASE_SCORES,                    # Updated with new scoring
     PRIORITY_THRESHOLDS,            # New: category thresholds
     CLINICAL_CHANGE_TYPES,          # New: clinical change classifications
-    CLINICAL_OVERRIDE               # Kept: legacy benign/pathogenic handling
+    CLINICAL_OVERRIDE,              # Kept: legacy benign/pathogenic handling
+    PRIORITY_CATEGORIES             # Fixed category order for the Categorical column
 )
-from utils.impact_utils import calculate_impact_transition_magnitude
+from config.constants import IMPACT_NUMERIC_VALUES
+from utils.impact_utils import calculate_impact_transition_magnitude, encode_impact_levels
+from utils.clinical_utils import as_clinical_category
+
+# Optional: Numba JIT for the scoring kernel (falls back to numpy)
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Optional: Numba CUDA for the GPU scoring kernel (independent of the CPU kernel)
+try:
+    from numba import cuda
+    CUDA_AVAILABLE = True
+except ImportError:
+    CUDA_AVAILABLE = False
+
+# CUDA launch configuration for the optional GPU scoring path
+CUDA_THREADS_PER_BLOCK = 256
+
+# int8 change flags derived once from the (empty when unchanged) change columns
+CHANGE_FLAG_COLUMNS = {
+    'has_clin_change': 'clin_sig_change',
+    'has_sift_change': 'sift_change',
+    'has_polyphen_change': 'polyphen_change'
+}
+
+# int8 code of each priority category (position in PRIORITY_CATEGORIES)
+PRIORITY_CATEGORY_CODES = {category: code for code, category in enumerate(PRIORITY_CATEGORIES)}
+
+
+def _scoring_source_files():
+    """
+    Source files of this module and every in-repo module it imports, transitively
+
+    Imports are read from the module ASTs; names that do not resolve to a file
+    under the repository root (numpy, pandas, ...) are skipped.
+    """
+    root = Path(__file__).resolve().parent.parent
+    pending, seen = [Path(__file__).resolve()], set()
+    while pending:
+        path = pending.pop()
+        if path in seen:
+            continue
+        seen.add(path)
+        package = path.parent.relative_to(root).parts
+        for node in ast.walk(ast.parse(path.read_text(encoding='utf-8'))):
+            if isinstance(node, ast.Import):
+                modules = [alias.name.split('.') for alias in node.names]
+            elif isinstance(node, ast.ImportFrom):
+                base = list(package[:len(package) - node.level + 1]) if node.level else []
+                module = base + (node.module.split('.') if node.module else [])
+                # "from package import name" may name a submodule
+                modules = [module] + [module + [alias.name] for alias in node.names]
+            else:
+                continue
+            for parts in modules:
+                for depth in range(1, len(parts) + 1):
+                    prefix = root.joinpath(*parts[:depth])
+                    for candidate in (prefix / '__init__.py', prefix.with_suffix('.py')):
+                        if candidate.is_file():
+                            pending.append(candidate)
+    return sorted(seen)
+
+
+def scoring_fingerprint():
+    """
+    Hash of the source of everything that determines the priority scores
+
+    Covers this module and every in-repo module it imports (scoring config,
+    constants, impact and clinical helpers, ...), so cached scores are only
+    reused while none of that code or configuration has changed.
+    """
+    root = Path(__file__).resolve().parent.parent
+    digest = hashlib.blake2b(digest_size=16)
+    for path in _scoring_source_files():
+        digest.update(path.relative_to(root).as_posix().encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def _score_kernel(component_flags, component_weights, benign_override, pathogenic_override,
+                      benign_factor, pathogenic_factor):
+        """Weighted component sum with clinical evidence override (compiled)"""
+        n_variants, n_components = component_flags.shape
+        scores = np.empty(n_variants, dtype=np.float64)  # every element is written below
+        for i in prange(n_variants):
+            score = 0.0
+            for j in range(n_components):
+                if component_flags[i, j]:
+                    score += component_weights[j]
+            if benign_override[i]:
+                score *= benign_factor
+            elif pathogenic_override[i]:
+                score *= pathogenic_factor
+            scores[i] = score
+        return scores
+
+
+if CUDA_AVAILABLE:
+    @cuda.jit
+    def _score_kernel_cuda(component_flags, component_weights, benign_override, pathogenic_override,
+                           benign_factor, pathogenic_factor, scores):
+        """GPU version of _score_kernel: one thread per variant"""
+        i = cuda.grid(1)
+        if i < component_flags.shape[0]:
+            score = 0.0
+            for j in range(component_flags.shape[1]):
+                if component_flags[i, j]:
+                    score += component_weights[j]
+            if benign_override[i]:
+                score *= benign_factor
+            elif pathogenic_override[i]:
+                score *= pathogenic_factor
+            scores[i] = score
+
+
+def gpu_scoring_available():
+    """Check whether the CUDA scoring kernel can run (numba.cuda importable and a GPU present)"""
+    return CUDA_AVAILABLE and cuda.is_available()
+
+
+def _column(df, name, default):
+    """Column from df, or a constant series when the column is absent (older caches)"""
+    if name in df.columns:
+        return df[name]
+    return pd.Series(default, index=df.index)
+
+
+def _text_column(df, name, default=''):
+    """String view of a column with missing values replaced by default"""
+    return _column(df, name, default).fillna(default).astype(str)
+
+
+def _numeric_column(df, name, default):
+    """Numeric view of a column (unparseable values become NaN)"""
+    return pd.to_numeric(_column(df, name, default), errors='coerce')
+
+
+def _categorize_clinical_columns(result_df):
+    """Normalized clinical significance has 8 possible values: store as Categorical (in place)"""
+    for build in ['hg19', 'hg38']:
+        column = f'{build}_clin_sig_normalized'
+        if column in result_df.columns:
+            result_df[column] = as_clinical_category(result_df[column])
+
+
+def score_components(component_flags, component_weights, benign_override, pathogenic_override,
+                     benign_factor, pathogenic_factor, use_gpu=False):
+    """
+    Calculate priority scores from per-variant scoring components
+
+    Args:
+        component_flags: int8 matrix (variants x components), 1 where a rule applies
+        component_weights: float64 array of points per component
+        benign_override: bool array, variants receiving the benign reduction
+        pathogenic_override: bool array, variants receiving the pathogenic boost
+        benign_factor: Benign reduction multiplier
+        pathogenic_factor: Pathogenic boost multiplier
+        use_gpu: Run the CUDA kernel (caller checks gpu_scoring_available())
+
+    Returns:
+        np.ndarray: float64 priority scores (before rounding)
+    """
+    n_variants = len(component_flags)
+    if use_gpu and n_variants > 0:
+        scores = cuda.device_array(n_variants, dtype=np.float64)
+        blocks = (n_variants + CUDA_THREADS_PER_BLOCK - 1) // CUDA_THREADS_PER_BLOCK
+        _score_kernel_cuda[blocks, CUDA_THREADS_PER_BLOCK](
+            cuda.to_device(component_flags), cuda.to_device(component_weights),
+            cuda.to_device(benign_override), cuda.to_device(pathogenic_override),
+            benign_factor, pathogenic_factor, scores
+        )
+        return scores.copy_to_host()
+
+    if NUMBA_AVAILABLE:
+        return _score_kernel(component_flags, component_weights, benign_override, pathogenic_override,
+                             benign_factor, pathogenic_factor)
+
+    scores = component_flags @ component_weights
+    return np.where(benign_override, scores * benign_factor,
+                    np.where(pathogenic_override, scores * pathogenic_factor, scores))
 
 
 class ClinicalScorer:
     """Calculate clinical priority scores with clinical evidence-first approach"""
-    
-    def __init__(self):
-        """Initialize clinical scorer with updated configuration"""
+
+    def __init__(self, use_gpu=False):
+        """
+        Initialize clinical scorer with updated configuration
+
+        Args:
+            use_gpu: Score on a CUDA GPU via Numba (falls back to CPU if unavailable)
+        """
         self.base_scores = BASE_SCORES
         self.thresholds = PRIORITY_THRESHOLDS
         self.clinical_types = CLINICAL_CHANGE_TYPES
         self.clinical_override = CLINICAL_OVERRIDE
 
+        self.use_gpu = use_gpu and gpu_scoring_available()
+        if use_gpu and not self.use_gpu:
+            print("Warning: CUDA GPU not available (requires numba and a CUDA device), scoring on CPU")
+
     def assign_priority_category(self, score, score_details):
         """Assign category based on score thresholds with strict CONCORDANT criteria"""
-        
+
         # STRICT CONCORDANT: Only gene annotation differences allowed
         if score == 0:
             return 'CONCORDANT'
@@ -38,193 +241,267 @@ class ClinicalScorer:
             gene_only = all('gene changes' in detail.lower() for detail in score_details if detail)
             if gene_only:
                 return 'CONCORDANT'
-        
+
         # Regular thresholds for other categories
         for category in ['CRITICAL', 'MODERATE', 'LOW']:
             if score >= self.thresholds[category]:
                 return category
-        
+
         return 'LOW'  # Fallback for edge cases
- 
+
+    def _assign_priority_categories(self, scores, gene_only):
+        """
+        Vectorized assign_priority_category over all variants
+
+        Returns int8 codes into PRIORITY_CATEGORIES, so the Categorical column is built
+        from codes without materializing or hashing per-variant strings.
+        """
+        concordant = (scores == 0) | ((scores <= self.base_scores['gene_changes']) & gene_only)
+        return np.select(
+            [concordant,
+             scores >= self.thresholds['CRITICAL'],
+             scores >= self.thresholds['MODERATE'],
+             scores >= self.thresholds['LOW']],
+            [PRIORITY_CATEGORY_CODES['CONCORDANT'], PRIORITY_CATEGORY_CODES['CRITICAL'],
+             PRIORITY_CATEGORY_CODES['MODERATE'], PRIORITY_CATEGORY_CODES['LOW']],
+            default=PRIORITY_CATEGORY_CODES['LOW']  # Fallback for edge cases
+        ).astype(np.int8)
+
+    def _build_score_components(self, df):
+        """
+        Translate the scoring rules into ordered (label, weight, mask) components
+
+        Component order matches the order details appear in score_breakdown.
+        """
+        def text(name, default=''):
+            return _text_column(df, name, default)
+
+        def numeric(name, default):
+            return _numeric_column(df, name, default)
+
+        base = self.base_scores
+        components = []
+
+        # ===== TRANSCRIPT MATCHING ISSUES =====
+        transcript_status = text('transcript_crossbuild_status')
+        components += [
+            (f"Transcript mismatch ({base['transcript_mismatch']})", base['transcript_mismatch'],
+             transcript_status == 'MANE_hg38_Only'),
+            (f"No matching transcripts ({base['no_matching_transcripts']})", base['no_matching_transcripts'],
+             transcript_status == 'No_Matching_Transcripts'),
+            (f"No transcripts ({base['no_transcripts']})", base['no_transcripts'],
+             transcript_status == 'No_Transcripts'),
+        ]
+
+        # ===== CRITICAL PRIORITY: HGVS concordance on priority transcript =====
+        # Only score HGVS issues if we actually have transcripts to analyze
+        has_transcripts = ~transcript_status.isin(['No_Matching_Transcripts', 'No_Transcripts'])
+        hgvsc_concordance = text('priority_hgvsc_concordance')
+        hgvsp_concordance = text('priority_hgvsp_concordance')
+        components += [
+            (f"HGVSc mismatch ({base['priority_hgvsc_mismatch']})", base['priority_hgvsc_mismatch'],
+             has_transcripts & (hgvsc_concordance == 'Mismatch')),
+            (f"Missing HGVSc data ({base['missing_hgvs_data']})", base['missing_hgvs_data'],
+             has_transcripts & (hgvsc_concordance == 'No_Analysis')),
+            (f"HGVSp mismatch ({base['priority_hgvsp_mismatch']})", base['priority_hgvsp_mismatch'],
+             has_transcripts & (hgvsp_concordance == 'Mismatch')),
+            (f"Missing HGVSp data ({base['missing_hgvs_data']})", base['missing_hgvs_data'],
+             has_transcripts & (hgvsp_concordance == 'No_Analysis')),
+        ]
+
+        # ===== CLINICAL SIGNIFICANCE CHANGES =====
+        # Mutually exclusive, first matching rule wins
+        clin_change = text('clin_sig_change')
+        clinical_rules = [
+            (f"Pathogenic↔Benign change ({base['pathogenic_benign_flip']})", base['pathogenic_benign_flip'],
+             clin_change.isin(self.clinical_types['pathogenic_benign_flip'])),
+            (f"Pathogenic↔VUS change ({base['pathogenic_vus_change']})", base['pathogenic_vus_change'],
+             clin_change.isin(self.clinical_types['pathogenic_vus_change'])),
+            (f"VUS↔Benign change ({base['vus_benign_change']})", base['vus_benign_change'],
+             clin_change.isin(self.clinical_types['vus_benign_change'])),
+            (f"Minor clinical change ({base['minor_clinical_changes']})", base['minor_clinical_changes'],
+             clin_change.isin(self.clinical_types['minor_clinical_changes'])),
+            (f"Missing clinical data ({base['missing_clinical_data']})", base['missing_clinical_data'],
+             (clin_change == 'NONE') | clin_change.str.startswith('STABLE_NONE')),
+        ]
+        already_matched = pd.Series(False, index=df.index)
+        for label, weight, mask in clinical_rules:
+            components.append((label, weight, mask & ~already_matched))
+            already_matched |= mask
+
+        # ===== WORST CONSEQUENCE DIFFERENCES =====
+        # Analyze severity of difference using impact changes as proxy
+        has_worst_difference = text('has_worst_consequence_difference') == 'YES'
+        has_impact_changes = numeric('impact_changes', 0) > 0
+        components += [
+            (f"Serious consequence difference ({base['serious_consequence_difference']})",
+             base['serious_consequence_difference'], has_worst_difference & has_impact_changes),
+            (f"Minor consequence difference ({base['minor_clinical_changes']})",
+             base['minor_clinical_changes'], has_worst_difference & ~has_impact_changes),
+        ]
+
+        # ===== BASIC ANNOTATION CHANGES =====
+        components += [
+            (f"Gene changes ({base['gene_changes']})", base['gene_changes'],
+             numeric('gene_changes', 0) > 0),
+            (f"Impact changes ({base['impact_changes']})", base['impact_changes'],
+             has_impact_changes),
+        ]
+
+        # ===== PATHOGENICITY PREDICTION CHANGES =====
+        components += [
+            (f"SIFT change ({base['prediction_changes']})", base['prediction_changes'],
+             text('sift_change').str.contains('TO', regex=False)),
+            (f"PolyPhen change ({base['prediction_changes']})", base['prediction_changes'],
+             text('polyphen_change').str.contains('TO', regex=False)),
+        ]
+
+        # ===== TECHNICAL LIFTOVER ISSUES =====
+        position_mismatch = base.get('position_mismatch', 20)
+        position_difference_large = base.get('position_difference_large', 15)
+        position_difference_moderate = base.get('position_difference_moderate', 10)
+        genotype_mismatch = base.get('genotype_mismatch', 20)
+        ref_alt_swap = base.get('ref_alt_swap', 10)
+        pos_diff = numeric('pos_difference', 0)
+        components += [
+            (f"Position mismatch ({position_mismatch})", position_mismatch,
+             numeric('pos_match', 1) == 0),
+            (f"Large position difference ({position_difference_large})", position_difference_large,
+             pos_diff > 100),
+            (f"Moderate position difference ({position_difference_moderate})", position_difference_moderate,
+             (pos_diff > 10) & ~(pos_diff > 100)),
+            (f"Genotype mismatch ({genotype_mismatch})", genotype_mismatch,
+             numeric('gt_match', 1) == 0),
+            # BCFtools swap handling
+            (f"Ref/Alt swap ({ref_alt_swap})", ref_alt_swap,
+             text('swap', 'NA') == '1'),
+        ]
+
+        return components
+
+    def _build_override_masks(self, df):
+        """Benign reduction / pathogenic boost masks (benign takes precedence)"""
+        def text(name):
+            return _text_column(df, name)
+
+        # Encoded impact levels (see calculate_scores_from_analysis)
+        hg19_impact = df['hg19_impact_numeric']
+        hg38_impact = df['hg38_impact_numeric']
+        low_or_modifier = [IMPACT_NUMERIC_VALUES['MODIFIER'], IMPACT_NUMERIC_VALUES['LOW']]
+        high = IMPACT_NUMERIC_VALUES['HIGH']
+        hg19_clin = text('hg19_clin_sig_normalized')
+        hg38_clin = text('hg38_clin_sig_normalized')
+        predictions_lower = {
+            col: text(col).str.lower() for col in ['hg19_sift', 'hg38_sift', 'hg19_polyphen', 'hg38_polyphen']
+        }
+
+        is_low_modifier_impact = (
+            hg19_impact.isin(low_or_modifier) &
+            hg38_impact.isin(low_or_modifier)
+        )
+
+        has_benign_evidence = (hg19_clin == 'BENIGN') | (hg38_clin == 'BENIGN')
+        for values in predictions_lower.values():
+            has_benign_evidence |= values.str.contains('benign', regex=False)
+
+        is_benign_variant = is_low_modifier_impact & has_benign_evidence
+
+        has_pathogenic_evidence = (
+            (hg19_clin == 'PATHOGENIC') | (hg38_clin == 'PATHOGENIC') |
+            (hg19_impact == high) | (hg38_impact == high) |
+            predictions_lower['hg19_sift'].str.contains('deleterious', regex=False) |
+            predictions_lower['hg38_sift'].str.contains('deleterious', regex=False) |
+            predictions_lower['hg19_polyphen'].str.contains('probably_damaging', regex=False) |
+            predictions_lower['hg38_polyphen'].str.contains('probably_damaging', regex=False)
+        )
+
+        return is_benign_variant.to_numpy(dtype=bool), (has_pathogenic_evidence & ~is_benign_variant).to_numpy(dtype=bool)
+
     def calculate_scores_from_analysis(self, vep_analysis_df):
         """Calculate priority scores using priority transcript approach"""
         print("Calculating priority scores using priority transcript approach...")
-        
-        scored_variants = []
-        
-        for _, row in vep_analysis_df.iterrows():
-            # Initialize scoring
-            priority_score = 0
-            score_details = []
-
-            # ===== TRANSCRIPT MATCHING ISSUES =====
-            transcript_status = row.get('transcript_crossbuild_status', '')
-            if transcript_status == 'MANE_hg38_Only':
-                priority_score += self.base_scores['transcript_mismatch']
-                score_details.append(f"Transcript mismatch ({self.base_scores['transcript_mismatch']})")
-            elif transcript_status == 'No_Matching_Transcripts':
-                priority_score += self.base_scores['no_matching_transcripts']
-                score_details.append(f"No matching transcripts ({self.base_scores['no_matching_transcripts']})")
-            elif transcript_status == 'No_Transcripts':
-                priority_score += self.base_scores['no_transcripts']
-                score_details.append(f"No transcripts ({self.base_scores['no_transcripts']})")
-            
-            # ===== CRITICAL PRIORITY: HGVS concordance on priority transcript =====
-            # Only score HGVS issues if we actually have transcripts to analyze
-            if transcript_status not in ['No_Matching_Transcripts', 'No_Transcripts']:
-                if row.get('priority_hgvsc_concordance') == 'Mismatch':
-                    priority_score += self.base_scores['priority_hgvsc_mismatch']
-                    score_details.append(f"HGVSc mismatch ({self.base_scores['priority_hgvsc_mismatch']})")
-                elif row.get('priority_hgvsc_concordance') == 'No_Analysis':
-                    priority_score += self.base_scores['missing_hgvs_data']
-                    score_details.append(f"Missing HGVSc data ({self.base_scores['missing_hgvs_data']})")
-                
-                if row.get('priority_hgvsp_concordance') == 'Mismatch':
-                    priority_score += self.base_scores['priority_hgvsp_mismatch']
-                    score_details.append(f"HGVSp mismatch ({self.base_scores['priority_hgvsp_mismatch']})")
-                elif row.get('priority_hgvsp_concordance') == 'No_Analysis':
-                    priority_score += self.base_scores['missing_hgvs_data']
-                    score_details.append(f"Missing HGVSp data ({self.base_scores['missing_hgvs_data']})")
-            
-            # ===== CLINICAL SIGNIFICANCE CHANGES =====
-            clin_change = str(row.get('clin_sig_change', ''))
-            if clin_change in self.clinical_types['pathogenic_benign_flip']:
-                priority_score += self.base_scores['pathogenic_benign_flip']
-                score_details.append(f"Pathogenic↔Benign change ({self.base_scores['pathogenic_benign_flip']})")
-            elif clin_change in self.clinical_types['pathogenic_vus_change']:
-                priority_score += self.base_scores['pathogenic_vus_change']
-                score_details.append(f"Pathogenic↔VUS change ({self.base_scores['pathogenic_vus_change']})")
-            elif clin_change in self.clinical_types['vus_benign_change']:
-                priority_score += self.base_scores['vus_benign_change']
-                score_details.append(f"VUS↔Benign change ({self.base_scores['vus_benign_change']})")
-            elif clin_change in self.clinical_types['minor_clinical_changes']:
-                priority_score += self.base_scores['minor_clinical_changes']
-                score_details.append(f"Minor clinical change ({self.base_scores['minor_clinical_changes']})")
-            elif clin_change == 'NONE' or clin_change.startswith('STABLE_NONE'):
-                priority_score += self.base_scores['missing_clinical_data']
-                score_details.append(f"Missing clinical data ({self.base_scores['missing_clinical_data']})")
-            
-            # ===== WORST CONSEQUENCE DIFFERENCES =====
-            if row.get('has_worst_consequence_difference') == 'YES':
-                # Analyze severity of difference using impact changes as proxy
-                if row.get('impact_changes', 0) > 0:
-                    priority_score += self.base_scores['serious_consequence_difference']
-                    score_details.append(f"Serious consequence difference ({self.base_scores['serious_consequence_difference']})")
-                else:
-                    priority_score += self.base_scores['minor_clinical_changes']
-                    score_details.append(f"Minor consequence difference ({self.base_scores['minor_clinical_changes']})")
-            
-            # ===== BASIC ANNOTATION CHANGES =====
-            if row.get('gene_changes', 0) > 0:
-                priority_score += self.base_scores['gene_changes']
-                score_details.append(f"Gene changes ({self.base_scores['gene_changes']})")
-            
-            if row.get('impact_changes', 0) > 0:
-                priority_score += self.base_scores['impact_changes']
-                score_details.append(f"Impact changes ({self.base_scores['impact_changes']})")
-            
-            # ===== PATHOGENICITY PREDICTION CHANGES =====
-            if 'TO' in str(row.get('sift_change', '')):
-                priority_score += self.base_scores['prediction_changes']
-                score_details.append(f"SIFT change ({self.base_scores['prediction_changes']})")
-            
-            if 'TO' in str(row.get('polyphen_change', '')):
-                priority_score += self.base_scores['prediction_changes']
-                score_details.append(f"PolyPhen change ({self.base_scores['prediction_changes']})")
-            
-            # ===== APPLY CLINICAL EVIDENCE OVERRIDE =====
-            # Keep existing benign/pathogenic override logic
-            is_low_modifier_impact = (
-                row.get('hg19_impact') in ['MODIFIER', 'LOW'] and 
-                row.get('hg38_impact') in ['MODIFIER', 'LOW']
-            )
-        
-            has_benign_evidence = (
-                row.get('hg19_clin_sig_normalized') == 'BENIGN' or 
-                row.get('hg38_clin_sig_normalized') == 'BENIGN' or
-                'benign' in str(row.get('hg19_sift', '')).lower() or
-                'benign' in str(row.get('hg19_polyphen', '')).lower() or
-                'benign' in str(row.get('hg38_sift', '')).lower() or
-                'benign' in str(row.get('hg38_polyphen', '')).lower()
-            )
-        
-            is_benign_variant = is_low_modifier_impact and has_benign_evidence
-        
-            has_pathogenic_evidence = (
-                row.get('hg19_clin_sig_normalized') == 'PATHOGENIC' or 
-                row.get('hg38_clin_sig_normalized') == 'PATHOGENIC' or
-                row.get('hg19_impact') == 'HIGH' or row.get('hg38_impact') == 'HIGH' or
-                'deleterious' in str(row.get('hg19_sift', '')).lower() or
-                'deleterious' in str(row.get('hg38_sift', '')).lower() or
-                'probably_damaging' in str(row.get('hg19_polyphen', '')).lower() or
-                'probably_damaging' in str(row.get('hg38_polyphen', '')).lower()
-            )
-
-            # ===== TECHNICAL LIFTOVER ISSUES =====
-            if row.get('pos_match', 1) == 0:
-                priority_score += self.base_scores.get('position_mismatch', 20)
-                score_details.append(f"Position mismatch ({self.base_scores.get('position_mismatch', 20)})")
-            
-            pos_diff = row.get('pos_difference', 0)
-            if pos_diff > 100:
-                priority_score += self.base_scores.get('position_difference_large', 15)
-                score_details.append(f"Large position difference ({self.base_scores.get('position_difference_large', 15)})")
-            elif pos_diff > 10:
-                priority_score += self.base_scores.get('position_difference_moderate', 10)
-                score_details.append(f"Moderate position difference ({self.base_scores.get('position_difference_moderate', 10)})")
-            
-            if row.get('gt_match', 1) == 0:
-                priority_score += self.base_scores.get('genotype_mismatch', 20)
-                score_details.append(f"Genotype mismatch ({self.base_scores.get('genotype_mismatch', 20)})")
-            
-            # BCFtools swap handling
-            if str(row.get('swap', 'NA')) == '1':
-                priority_score += self.base_scores.get('ref_alt_swap', 10)
-                score_details.append(f"Ref/Alt swap ({self.base_scores.get('ref_alt_swap', 10)})")
-            
-            # Apply clinical evidence override
-            if is_benign_variant:
-                priority_score *= self.clinical_override['benign_reduction_factor']
-                score_details.append("Benign evidence override (×0.1)")
-            elif has_pathogenic_evidence:
-                priority_score *= self.clinical_override['pathogenic_boost_factor']
-                score_details.append("Pathogenic evidence boost (×2.0)")
-            
-            # ===== ASSIGN PRIORITY CATEGORY BASED ON SCORE THRESHOLDS =====
-            priority_category = self.assign_priority_category(priority_score, score_details)
-
-            
-            # ===== CREATE VARIANT RECORD =====
-            variant_info = row.to_dict()
-            variant_info['priority_score'] = int(round(priority_score))
-            variant_info['priority_category'] = priority_category
-            variant_info['score_breakdown'] = '; '.join(score_details) if score_details else 'No significant issues'
-            
-            scored_variants.append(variant_info)
-
-        # Create the initial dataframe
-        result_df = pd.DataFrame(scored_variants)
+
+        result_df = vep_analysis_df.reset_index(drop=True).copy()
+
+        # Encode impact levels once (int8) so impact tests are integer comparisons
+        for build in ['hg19', 'hg38']:
+            result_df[f'{build}_impact_numeric'] = encode_impact_levels(_column(result_df, f'{build}_impact', None))
+
+        # Pack change columns into int8 flags once for summaries and filters
+        # (one non-empty test over the (variants x change columns) matrix)
+        change_text = pd.DataFrame({
+            change_column: _column(result_df, change_column, '') for change_column in CHANGE_FLAG_COLUMNS.values()
+        })
+        has_change = (change_text.fillna('').to_numpy(dtype=object) != '').astype(np.int8)
+        for i, flag_column in enumerate(CHANGE_FLAG_COLUMNS):
+            result_df[flag_column] = has_change[:, i]
+
+        # ===== SCORE COMPONENTS =====
+        components = self._build_score_components(result_df)
+        labels = [label for label, _, _ in components]
+        component_weights = np.array([weight for _, weight, _ in components], dtype=np.float64)
+        component_flags = np.column_stack(
+            [mask.to_numpy(dtype=bool) for _, _, mask in components]
+        ).astype(np.int8)
+
+        # ===== APPLY CLINICAL EVIDENCE OVERRIDE =====
+        benign_override, pathogenic_override = self._build_override_masks(result_df)
+
+        priority_scores = score_components(
+            component_flags, component_weights, benign_override, pathogenic_override,
+            float(self.clinical_override['benign_reduction_factor']),
+            float(self.clinical_override['pathogenic_boost_factor']),
+            use_gpu=self.use_gpu
+        )
+
+        # ===== ASSIGN PRIORITY CATEGORY BASED ON SCORE THRESHOLDS =====
+        gene_changes_index = next(i for i, label in enumerate(labels) if label.startswith('Gene changes'))
+        # Any rule besides gene changes: row total exceeds the gene-changes flag (no matrix copy)
+        other_components = component_flags.sum(axis=1, dtype=np.int16) > component_flags[:, gene_changes_index]
+        gene_only = ~other_components & ~benign_override & ~pathogenic_override
+        priority_category_codes = self._assign_priority_categories(priority_scores, gene_only)
+
+        # ===== SCORE BREAKDOWN =====
+        # Few distinct rule combinations exist, so format each combination once
+        override_flags = np.column_stack([benign_override, pathogenic_override]).astype(np.int8)
+        all_flags = np.hstack([component_flags, override_flags])
+        all_labels = labels + ["Benign evidence override (×0.1)", "Pathogenic evidence boost (×2.0)"]
+        unique_patterns, pattern_index = np.unique(all_flags, axis=0, return_inverse=True)
+        breakdowns = np.array([
+            '; '.join(label for label, flag in zip(all_labels, pattern) if flag) or 'No significant issues'
+            for pattern in unique_patterns
+        ], dtype=object)
+
+        # ===== CREATE VARIANT RECORDS =====
+        result_df['priority_score'] = np.round(priority_scores).astype(np.int32)  # integral, well inside int32
+        result_df['priority_category'] = pd.Categorical.from_codes(priority_category_codes, categories=PRIORITY_CATEGORIES)
+        result_df['score_breakdown'] = breakdowns[pattern_index.ravel()]
 
         # Add Clinical_Change_Direction column using same categorization as Plot 3
-        def categorize_clin_sig_transition_for_plotting(row):
-            """Reuse the same categorization logic as Plot 3"""
-            hg19 = row.get('hg19_clin_sig_normalized', '')
-            hg38 = row.get('hg38_clin_sig_normalized', '')
-            
-            if hg19 == hg38:
-                return f'Stable {hg19}' if hg19 else 'Stable NONE'
-            elif hg38 == 'PATHOGENIC':
-                return '→ PATHOGENIC'
-            elif hg19 == 'PATHOGENIC':
-                return 'FROM PATHOGENIC →'
-            elif hg38 == 'BENIGN':
-                return '→ BENIGN'
-            elif hg19 == 'BENIGN':
-                return 'FROM BENIGN →'
-            else:
-                return 'Other Transitions'
+        hg19 = _text_column(result_df, 'hg19_clin_sig_normalized')
+        hg38 = _text_column(result_df, 'hg38_clin_sig_normalized')
+        stable_label = 'Stable ' + hg19.where(hg19 != '', 'NONE')
+        result_df['Clinical_Change_Direction'] = np.select(
+            [hg19 == hg38, hg38 == 'PATHOGENIC', hg19 == 'PATHOGENIC', hg38 == 'BENIGN', hg19 == 'BENIGN'],
+            [stable_label, '→ PATHOGENIC', 'FROM PATHOGENIC →', '→ BENIGN', 'FROM BENIGN →'],
+            default='Other Transitions'
+        )
+
+        _categorize_clinical_columns(result_df)
+        return result_df
+
+    @staticmethod
+    def extract_score_columns(scored_df, vep_analysis_df):
+        """Columns scoring added to the VEP analysis (what the scores cache stores)"""
+        return scored_df[scored_df.columns.difference(vep_analysis_df.columns, sort=False)]
 
-        result_df['Clinical_Change_Direction'] = result_df.apply(categorize_clin_sig_transition_for_plotting, axis=1)
-    
+    @staticmethod
+    def attach_scores(vep_analysis_df, score_columns):
+        """
+        Rebuild the scored dataframe from the VEP analysis and cached score columns
 
-        return result_df
\ No newline at end of file
+        Gives the same frame as calculate_scores_from_analysis without rescoring.
+        """
+        result_df = pd.concat([vep_analysis_df.reset_index(drop=True), score_columns], axis=1)
+        _categorize_clinical_columns(result_df)
+        return result_df
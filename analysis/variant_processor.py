@@ -6,17 +6,33 @@ caching, and clinical scoring.
 """
 
 from .vep_analyzer import VEPAnalyzer
-from .scoring_engine import ClinicalScorer
+from .scoring_engine import ClinicalScorer, scoring_fingerprint
 from .cache_manager import CacheManager
+from utils.data_utils import convert_to_arrow_strings
+
+# String columns compared across builds during scoring and summary statistics
+ARROW_STRING_COLUMNS = [
+    'hg19_gene', 'hg38_gene',
+    'priority_consequence_hg19', 'priority_consequence_hg38',
+    'hg19_sift', 'hg38_sift',
+    'hg19_polyphen', 'hg38_polyphen',
+    'hg19_clin_sig', 'hg38_clin_sig'
+]
 
 
 class VariantProcessor:
     """Main orchestrator for variant analysis pipeline"""
     
-    def __init__(self):
-        """Initialize variant processor with analysis components"""
-        self.vep_analyzer = VEPAnalyzer()
-        self.clinical_scorer = ClinicalScorer()
+    def __init__(self, use_gpu=False, workers=None):
+        """
+        Initialize variant processor with analysis components
+        
+        Args:
+            use_gpu: Run priority scoring on a CUDA GPU when available
+            workers: Worker processes for chunked VEP analysis (default: 1, in-process)
+        """
+        self.vep_analyzer = VEPAnalyzer(max_workers=workers)
+        self.clinical_scorer = ClinicalScorer(use_gpu=use_gpu)
     
     def process_all_variants(self, conn, cache_file=None, force_recalculate=False):
         """
@@ -35,13 +51,22 @@ class VariantProcessor:
         # Initialize cache manager
         cache_manager = CacheManager(cache_file)
         
-        # Check for cached results (raw VEP analysis only, no scores)
+        fingerprint = scoring_fingerprint()
+        
+        # Check for cached results (raw VEP analysis, plus score columns while the scoring is unchanged)
         if cache_manager.should_use_cache(force_recalculate):
             try:
                 cached_vep_analysis = cache_manager.load_cache()
+                convert_to_arrow_strings(cached_vep_analysis, ARROW_STRING_COLUMNS)
+                
+                cached_scores = cache_manager.load_scores(fingerprint)
+                if cached_scores is not None and len(cached_scores) == len(cached_vep_analysis):
+                    return self.clinical_scorer.attach_scores(cached_vep_analysis, cached_scores)
                 
-                # Calculate scores on-the-fly (not cached)
+                # Scoring changed (or never cached): rescore from the cached analysis
                 result_df = self.clinical_scorer.calculate_scores_from_analysis(cached_vep_analysis)
+                cache_manager.save_scores(self.clinical_scorer.extract_score_columns(result_df, cached_vep_analysis),
+                                          fingerprint)
                 return result_df
             except Exception as e:
                 print(f"Warning: Could not load cache file ({e}), recalculating...")
@@ -51,7 +76,9 @@ class VariantProcessor:
         
         # Save VEP analysis to cache (without scores)
         cache_manager.save_cache(vep_analysis_df)
+        convert_to_arrow_strings(vep_analysis_df, ARROW_STRING_COLUMNS)
         
         # Calculate scores on-the-fly
         result_df = self.clinical_scorer.calculate_scores_from_analysis(vep_analysis_df)
+        cache_manager.save_scores(self.clinical_scorer.extract_score_columns(result_df, vep_analysis_df), fingerprint)
         return result_df
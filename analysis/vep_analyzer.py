@@ -5,6 +5,11 @@ Core VEP analysis engine for processing variant annotations and identifying
 transcript-level discordances between genome builds.
 """
 
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+
 import pandas as pd
 from utils.transcript_utils import (
     extract_genotype_from_alleles,
@@ -23,13 +28,25 @@ from utils.clinical_utils import (
 )
 from config.constants import VEP_CONSEQUENCE_IMPACT
 from utils.hgvs_utils import analyze_priority_transcript_hgvs
+from utils.data_utils import connect_read_only
+
+def _process_chunk_in_worker(db_path, chunk_variants):
+    """Process one variant chunk in a worker process with its own read-only connection"""
+    with closing(connect_read_only(db_path)) as conn:
+        return VEPAnalyzer(max_workers=1)._process_variant_chunk(conn, chunk_variants)
+
 
 class VEPAnalyzer:
     """Analyzes VEP annotations to identify discordances between genome builds"""
     
-    def __init__(self):
-        """Initialize VEP analyzer"""
-        pass
+    def __init__(self, max_workers=None):
+        """
+        Initialize VEP analyzer
+        
+        Args:
+            max_workers: Worker processes for chunk analysis (default: 1 = in-process)
+        """
+        self.max_workers = max_workers or 1
     
     def analyze_all_variants(self, conn):
         """
@@ -58,39 +75,45 @@ class VEPAnalyzer:
             c.mapping_status,
             c.pos_match,
             c.gt_match,
-            c.flip,
-            c.swap,
+            COALESCE(c.flip, '') as flip,
+            COALESCE(c.swap, '') as swap,
             c.liftover_hg38_pos,
-            c.source_alleles,
+            COALESCE(c.source_alleles, '') as source_alleles,
             ABS(COALESCE(c.liftover_hg38_pos, 0) - COALESCE(c.bcftools_hg38_pos, 0)) as pos_difference
         FROM comparison c
         WHERE c.bcftools_hg38_chrom IS NOT NULL 
           AND c.bcftools_hg38_pos IS NOT NULL
         """
         
-        variants_df = pd.read_sql_query(variant_query, conn)
-        print(f"Found {len(variants_df):,} unique variants for VEP analysis")
+        total_variants = conn.execute(f"SELECT COUNT(*) FROM ({variant_query})").fetchone()[0]
+        print(f"Found {total_variants:,} unique variants for VEP analysis")
         
-        # STEP 2: Process variants in chunks - MEMORY SAFE
+        # STEP 2: Stream variants in chunks - MEMORY SAFE
+        # (chunked read fetches rows with cursor.fetchmany, so only the chunks being
+        # processed are held in memory, not the whole comparison table)
         chunk_size = 10000  # Process 10K variants at a time
         all_vep_analyses = []
-        total_chunks = (len(variants_df) + chunk_size - 1) // chunk_size
+        total_chunks = (total_variants + chunk_size - 1) // chunk_size
         
-        print(f"Processing {len(variants_df):,} variants in {total_chunks} chunks of {chunk_size:,}...")
+        print(f"Processing {total_variants:,} variants in {total_chunks} chunks of {chunk_size:,}...")
         
-        for chunk_idx in range(total_chunks):
-            start_idx = chunk_idx * chunk_size
-            end_idx = min(start_idx + chunk_size, len(variants_df))
-            chunk_variants = variants_df.iloc[start_idx:end_idx]
-            
-            print(f"  Processing chunk {chunk_idx + 1}/{total_chunks} ({len(chunk_variants):,} variants)...")
-            
-            # Process this chunk of variants
-            chunk_analyses = self._process_variant_chunk(conn, chunk_variants)
-            all_vep_analyses.extend(chunk_analyses)
-            
-            # Memory cleanup
-            del chunk_variants
+        variant_chunks = pd.read_sql_query(variant_query, conn, chunksize=chunk_size)
+        
+        # Chunks are independent: fan them out to worker processes when there is more than one
+        # (workers open their own connection, so this needs a file-backed database)
+        db_path = conn.execute("PRAGMA database_list").fetchone()[2]
+        if self.max_workers > 1 and total_chunks > 1 and db_path:
+            all_vep_analyses = self._process_chunks_parallel(db_path, variant_chunks, total_chunks)
+        else:
+            for chunk_idx, chunk_variants in enumerate(variant_chunks):
+                print(f"  Processing chunk {chunk_idx + 1}/{total_chunks} ({len(chunk_variants):,} variants)...")
+                
+                # Process this chunk of variants
+                chunk_analyses = self._process_variant_chunk(conn, chunk_variants)
+                all_vep_analyses.extend(chunk_analyses)
+                
+                # Memory cleanup
+                del chunk_variants
         
         print(f"Completed VEP analysis of {len(all_vep_analyses):,} variants")
         
@@ -100,6 +123,35 @@ class VEPAnalyzer:
         
         return pd.DataFrame(all_vep_analyses)
     
+    def _process_chunks_parallel(self, db_path, variant_chunks, total_chunks):
+        """
+        Process variant chunks in a process pool, keeping results in chunk order
+        
+        At most two chunks per worker are in flight, so memory stays bounded
+        while the chunked read keeps the workers busy.
+        """
+        workers = min(self.max_workers, total_chunks)
+        print(f"  Using {workers} worker processes")
+        
+        vep_analyses = []
+        completed = 0
+        # Spawned rather than forked: the parent holds an open SQLite connection and
+        # may have numba/OpenMP thread pools running, which a fork would inherit
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+            pending = deque()
+            for chunk_variants in variant_chunks:
+                pending.append(executor.submit(_process_chunk_in_worker, db_path, chunk_variants))
+                while len(pending) >= 2 * workers or (pending and pending[0].done()):
+                    vep_analyses.extend(pending.popleft().result())
+                    completed += 1
+                    print(f"  Completed chunk {completed}/{total_chunks}")
+            while pending:
+                vep_analyses.extend(pending.popleft().result())
+                completed += 1
+                print(f"  Completed chunk {completed}/{total_chunks}")
+        
+        return vep_analyses
+    
     def _process_variant_chunk(self, conn, chunk_variants):
         """Process a chunk of variants with comprehensive VEP analysis"""
         vep_analyses = []
@@ -112,19 +164,31 @@ class VEPAnalyzer:
             hg38_pos = variant_row['bcftools_hg38_pos']
             
             # Get VEP annotations for this specific variant - TARGETED QUERIES
+            # Text columns are COALESCEd to '' here so downstream code never sees NULL strings
+            # (hgvsc/hgvsp stay raw: HGVS concordance treats a NULL differently from an empty string)
             hg19_query = """
-            SELECT feature_type, consequence, impact, symbol, feature, sift, polyphen, gnomadg_af, clin_sig, hgvsc, hgvsp, 
-                extracted_chrom, extracted_pos, extracted_ref, extracted_alt, allele,
-                mane, mane_select, mane_plus_clinical, refseq_transcript_id,
+            SELECT COALESCE(feature_type, '') as feature_type, COALESCE(consequence, '') as consequence,
+                COALESCE(impact, '') as impact, COALESCE(symbol, '') as symbol, COALESCE(feature, '') as feature,
+                COALESCE(sift, '') as sift, COALESCE(polyphen, '') as polyphen, gnomadg_af,
+                COALESCE(clin_sig, '') as clin_sig, hgvsc, hgvsp,
+                extracted_chrom, extracted_pos, extracted_ref, extracted_alt, COALESCE(allele, '') as allele,
+                COALESCE(mane, '') as mane, COALESCE(mane_select, '') as mane_select,
+                COALESCE(mane_plus_clinical, '') as mane_plus_clinical,
+                COALESCE(refseq_transcript_id, '') as refseq_transcript_id,
             CASE WHEN CANONICAL = 'YES' THEN 1 ELSE 0 END as is_canonical
             FROM hg19_vep 
             WHERE extracted_chrom = ? AND extracted_pos = ? AND extracted_ref = ? AND extracted_alt = ?
             """
             
             hg38_query = """
-            SELECT feature_type, consequence, impact, symbol, feature, sift, polyphen, gnomadg_af, clin_sig, hgvsc, hgvsp, 
-                extracted_chrom, extracted_pos, extracted_ref, extracted_alt, allele,
-                mane, mane_select, mane_plus_clinical, refseq_transcript_id,
+            SELECT COALESCE(feature_type, '') as feature_type, COALESCE(consequence, '') as consequence,
+                COALESCE(impact, '') as impact, COALESCE(symbol, '') as symbol, COALESCE(feature, '') as feature,
+                COALESCE(sift, '') as sift, COALESCE(polyphen, '') as polyphen, gnomadg_af,
+                COALESCE(clin_sig, '') as clin_sig, hgvsc, hgvsp,
+                extracted_chrom, extracted_pos, extracted_ref, extracted_alt, COALESCE(allele, '') as allele,
+                COALESCE(mane, '') as mane, COALESCE(mane_select, '') as mane_select,
+                COALESCE(mane_plus_clinical, '') as mane_plus_clinical,
+                COALESCE(refseq_transcript_id, '') as refseq_transcript_id,
             CASE WHEN CANONICAL = 'YES' THEN 1 ELSE 0 END as is_canonical
             FROM hg38_vep 
             WHERE extracted_chrom = ? AND extracted_pos = ? AND extracted_ref = ? AND extracted_alt = ?
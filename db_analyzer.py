@@ -55,7 +55,6 @@ NOTE: VEP consequence analysis has been moved to variant_prioritizer.py
       to eliminate redundancy and improve memory efficiency.
 """
 
-import sqlite3
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
@@ -65,6 +64,7 @@ import numpy as np
 import sys
 
 from utils.summary_utils import SummaryDataCalculator
+from utils.data_utils import connect_read_only, find_missing_tables
 import json
 
 # Set visualization style
@@ -76,26 +76,18 @@ def connect_database(db_path):
     if not Path(db_path).exists():
         raise FileNotFoundError(f"Database not found: {db_path}")
     
-    conn = sqlite3.connect(db_path)
+    conn = connect_read_only(db_path)
     
     # Verify required tables exist
-    cursor = conn.cursor()
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-    tables = [row[0] for row in cursor.fetchall()]
-    
-    required_tables = ['comparison']
-    missing_tables = [t for t in required_tables if t not in tables]
+    missing_tables = find_missing_tables(conn, ['comparison'])
     if missing_tables:
         raise ValueError(f"Missing required database tables: {missing_tables}")
     
     return conn
 
-def analyze_cross_variables(conn, output_dir):
-    """Analyze relationships between mapping_status, pos_match, and gt_match with enhanced plots"""
-    print("\n=== LIFTOVER TOOL PERFORMANCE ANALYSIS ===")
-    
-    # Get all comparison data
-    detailed_query = """
+def load_cross_variable_data(conn):
+    """Read the comparison columns used by the cross-variable plots"""
+    return pd.read_sql_query("""
     SELECT 
         mapping_status,
         pos_match,
@@ -103,9 +95,26 @@ def analyze_cross_variables(conn, output_dir):
         flip,
         swap
     FROM comparison
-    """
-    
-    detailed_df = pd.read_sql_query(detailed_query, conn)
+    """, conn)
+
+def assign_match_categories(detailed_df):
+    """Add match_category and concordance columns from pos_match/gt_match in one vectorized pass"""
+    pos_ok = (detailed_df['pos_match'] == 1).to_numpy()
+    gt_ok = (detailed_df['gt_match'] == 1).to_numpy()
+    pos_bad = (detailed_df['pos_match'] == 0).to_numpy()
+    gt_bad = (detailed_df['gt_match'] == 0).to_numpy()
+    
+    detailed_df['match_category'] = np.select(
+        [pos_ok & gt_ok, pos_ok & gt_bad, pos_bad & gt_ok],
+        ['Both Match', 'Position Only', 'Genotype Only'],
+        default='Both Mismatch'
+    )
+    detailed_df['concordance'] = np.where(pos_ok & gt_ok, 'Concordant', 'Discordant')
+    return detailed_df
+
+def analyze_cross_variables(detailed_df, output_dir):
+    """Analyze relationships between mapping_status, pos_match, and gt_match with enhanced plots"""
+    print("\n=== LIFTOVER TOOL PERFORMANCE ANALYSIS ===")
     
     print(f"Total variants analyzed: {len(detailed_df):,}")
     
@@ -115,12 +124,7 @@ def analyze_cross_variables(conn, output_dir):
     colors_flip_swap = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd']  # Blue, Orange, Green, Red, Purple
     
     # Calculate match categories
-    detailed_df['match_category'] = detailed_df.apply(lambda row: 
-        'Both Match' if row['pos_match'] == 1 and row['gt_match'] == 1
-        else 'Position Only' if row['pos_match'] == 1 and row['gt_match'] == 0
-        else 'Genotype Only' if row['pos_match'] == 0 and row['gt_match'] == 1
-        else 'Both Mismatch', axis=1
-    )
+    assign_match_categories(detailed_df)
     
     match_counts = detailed_df['match_category'].value_counts()
     category_order = ['Both Match', 'Position Only', 'Genotype Only', 'Both Mismatch']
@@ -184,12 +188,6 @@ def analyze_cross_variables(conn, output_dir):
     # PLOT 2: Concordance by mapping status (normalized percentages)
     print("2. Creating concordance by mapping status...")
     
-    # Define concordance
-    detailed_df['concordance'] = detailed_df.apply(lambda row:
-        'Concordant' if row['pos_match'] == 1 and row['gt_match'] == 1
-        else 'Discordant', axis=1
-    )
-    
     # Create contingency table and normalize within each mapping status
     concordance_mapping = pd.crosstab(detailed_df['mapping_status'], detailed_df['concordance'])
     concordance_pct = concordance_mapping.div(concordance_mapping.sum(axis=1), axis=0) * 100
@@ -346,11 +344,9 @@ def analyze_cross_variables(conn, output_dir):
     
     print("✓ Liftover analysis completed")
 
-def analyze_position_differences(conn, output_dir):
-    """Analyze position differences between liftover tools with enhanced visualizations"""
-    print("\n=== POSITION DIFFERENCES ANALYSIS ===")
-    
-    query = """
+def load_position_difference_data(conn):
+    """Read the variants whose liftover tools disagree on hg38 position"""
+    return pd.read_sql_query("""
     SELECT 
         mapping_status,
         source_chrom,
@@ -360,9 +356,11 @@ def analyze_position_differences(conn, output_dir):
         ABS(COALESCE(liftover_hg38_pos, 0) - COALESCE(bcftools_hg38_pos, 0)) as pos_diff
     FROM comparison 
     WHERE pos_match = 0 AND liftover_hg38_pos IS NOT NULL AND bcftools_hg38_pos IS NOT NULL
-    """
-    
-    diff_df = pd.read_sql_query(query, conn)
+    """, conn)
+
+def analyze_position_differences(diff_df, output_dir):
+    """Analyze position differences between liftover tools with enhanced visualizations"""
+    print("\n=== POSITION DIFFERENCES ANALYSIS ===")
     
     if len(diff_df) == 0:
         print("No position differences found between liftover tools")
@@ -517,20 +515,23 @@ def analyze_position_differences(conn, output_dir):
     
     print("✓ Position differences analysis completed")
 
+def ranked_group_counts(groups, key):
+    """Sum grouped counts per key, most frequent first with ties in first-appearance order (as value_counts)"""
+    totals = groups.groupby(key, sort=False).agg(count=('count', 'sum'), first_row=('first_row', 'min'))
+    return totals.sort_values(['count', 'first_row'], ascending=[False, True], kind='stable')['count']
+
 def generate_comprehensive_report(conn, output_dir):
     """Generate comprehensive analysis summary report"""
     print("\n=== GENERATING COMPREHENSIVE SUMMARY REPORT ===")
     
-    # Basic database statistics
-    total_variants = pd.read_sql_query("SELECT COUNT(*) as count FROM comparison", conn).iloc[0]['count']
-    
-    pos_match_rate = pd.read_sql_query("""
-        SELECT AVG(pos_match) as rate FROM comparison
-    """, conn).iloc[0]['rate']
-    
-    gt_match_rate = pd.read_sql_query("""
-        SELECT AVG(gt_match) as rate FROM comparison
-    """, conn).iloc[0]['rate']
+    # Basic database statistics (one aggregate scan)
+    overview = pd.read_sql_query("""
+        SELECT COUNT(*) as count, AVG(pos_match) as pos_rate, AVG(gt_match) as gt_rate
+        FROM comparison
+    """, conn)
+    total_variants = overview['count'].iloc[0]
+    pos_match_rate = overview['pos_rate'].iloc[0]
+    gt_match_rate = overview['gt_rate'].iloc[0]
     
     print(f"Total variants analyzed: {total_variants:,}")
     print(f"Position match rate: {pos_match_rate:.1%}")
@@ -549,44 +550,36 @@ def generate_comprehensive_report(conn, output_dir):
     print(f"\nBreakdown by mapping status:")
     print(mapping_stats.round(3))
     
-    # Get detailed statistics for summary file
-    detailed_query = """
-    SELECT 
-        mapping_status,
-        pos_match,
-        gt_match,
-        flip,
-        swap
-    FROM comparison
-    """
-    
-    detailed_df = pd.read_sql_query(detailed_query, conn)
+    # Match/concordance and flip/swap breakdowns aggregated in SQLite; MIN(rowid) keeps
+    # value_counts tie order (first appearance) without reading every comparison row
+    match_groups = pd.read_sql_query("""
+        SELECT pos_match, gt_match, COUNT(*) as count, MIN(rowid) as first_row
+        FROM comparison
+        GROUP BY pos_match, gt_match
+    """, conn)
+    total_compared = match_groups['count'].sum()
     
     # Calculate match categories
-    detailed_df['match_category'] = detailed_df.apply(lambda row: 
-        'Both Match' if row['pos_match'] == 1 and row['gt_match'] == 1
-        else 'Position Only' if row['pos_match'] == 1 and row['gt_match'] == 0
-        else 'Genotype Only' if row['pos_match'] == 0 and row['gt_match'] == 1
-        else 'Both Mismatch', axis=1
-    )
+    assign_match_categories(match_groups)
     
-    match_counts = detailed_df['match_category'].value_counts()
+    match_counts = ranked_group_counts(match_groups, 'match_category')
     category_order = ['Both Match', 'Position Only', 'Genotype Only', 'Both Mismatch']
     match_counts = match_counts.reindex([cat for cat in category_order if cat in match_counts.index])
     
     # Calculate concordance
-    detailed_df['concordance'] = detailed_df.apply(lambda row:
-        'Concordant' if row['pos_match'] == 1 and row['gt_match'] == 1
-        else 'Discordant', axis=1
-    )
-    concordance_summary = detailed_df['concordance'].value_counts()
+    concordance_summary = ranked_group_counts(match_groups, 'concordance')
     
     # Flip/Swap analysis for mismatched variants
-    mismatch_mask = (detailed_df['pos_match'] == 0) | (detailed_df['gt_match'] == 0)
-    mismatch_df = detailed_df[mismatch_mask].copy()
+    mismatch_groups = pd.read_sql_query("""
+        SELECT flip, swap, COUNT(*) as count, MIN(rowid) as first_row
+        FROM comparison
+        WHERE pos_match = 0 OR gt_match = 0
+        GROUP BY flip, swap
+    """, conn)
+    total_mismatched = mismatch_groups['count'].sum()
     
     flip_swap_summary = None
-    if len(mismatch_df) > 0:
+    if total_mismatched > 0:
         def categorize_flip_swap(row):
             flip_status = row['flip'] if pd.notna(row['flip']) else 'no_flip'
             
@@ -630,95 +623,97 @@ def generate_comprehensive_report(conn, output_dir):
             else:
                 return 'NONE'
         
-        mismatch_df['flip_swap_category'] = mismatch_df.apply(categorize_flip_swap, axis=1)
-        flip_swap_summary = mismatch_df['flip_swap_category'].value_counts()
+        mismatch_groups['flip_swap_category'] = mismatch_groups.apply(categorize_flip_swap, axis=1)
+        flip_swap_summary = ranked_group_counts(mismatch_groups, 'flip_swap_category')
     
     # Save comprehensive summary to file
     summary_file = output_dir / 'liftover_analysis_summary.txt'
-    with open(summary_file, 'w') as f:
-        f.write("GENOMIC VARIANT LIFTOVER TOOL ANALYSIS SUMMARY\n")
-        f.write("=" * 60 + "\n\n")
-        
-        # Database overview
-        f.write("DATABASE OVERVIEW\n")
-        f.write("-" * 20 + "\n")
-        f.write(f"Total variants analyzed: {total_variants:,}\n")
-        f.write(f"Position match rate: {pos_match_rate:.1%}\n")
-        f.write(f"Genotype match rate: {gt_match_rate:.1%}\n")
-        f.write(f"Analysis performed on VEP-normalized coordinates\n\n")
-        
-        # Mapping status breakdown
-        f.write("LIFTOVER TOOL PERFORMANCE\n")
-        f.write("-" * 30 + "\n")
-        f.write("Breakdown by mapping status:\n")
-        f.write(mapping_stats.to_string(index=False))
-        f.write("\n\n")
-        
-        # Match category breakdown
-        f.write("VARIANT MATCH CATEGORIES\n")
-        f.write("-" * 25 + "\n")
-        for category, count in match_counts.items():
-            pct = count / len(detailed_df) * 100
-            f.write(f"{category}: {count:,} ({pct:.1f}%)\n")
-        f.write("\n")
-        
-        # Concordance breakdown
-        f.write("CONCORDANCE ANALYSIS\n")
-        f.write("-" * 20 + "\n")
-        for status, count in concordance_summary.items():
-            pct = count / len(detailed_df) * 100
-            f.write(f"{status}: {count:,} ({pct:.1f}%)\n")
-        f.write("\n")
-        
-        # Flip/Swap analysis
-        if flip_swap_summary is not None and len(flip_swap_summary) > 0:
-            f.write("FLIP/SWAP ANALYSIS (Mismatched Variants Only)\n")
-            f.write("-" * 45 + "\n")
-            f.write(f"Total mismatched variants: {len(mismatch_df):,}\n\n")
-            f.write("BCFtools SWAP value meanings:\n")
-            f.write("• NA: No action needed; alleles already matched reference genome\n")
-            f.write("• 1: REF and ALT alleles were swapped to match reference genome\n")
-            f.write("• -1: REF and ALT alleles could not be swapped (ambiguous/invalid)\n\n")
-            f.write("Flip/Swap category breakdown:\n")
-            f.write("• FLIP: Strand flip occurred\n")
-            f.write("• SWAP: REF/ALT alleles were swapped during liftover\n")
-            f.write("• SWAP_FAILED: Swap attempted but failed (ambiguous alleles)\n")
-            f.write("• FLIP+SWAP: Both strand flip and allele swap occurred\n")
-            f.write("• NONE: No flip or swap operations needed\n\n")
-            for category, count in flip_swap_summary.items():
-                pct = count / len(mismatch_df) * 100
-                f.write(f"{category}: {count:,} ({pct:.1f}%)\n")
-            f.write("\n")
-        
-        # Generated files
-        f.write("GENERATED OUTPUT FILES\n")
-        f.write("-" * 25 + "\n")
-        f.write("• liftover_analysis.png - Liftover tool performance visualization\n")
-        f.write("• position_differences_analysis.png - Coordinate discrepancy analysis\n")
-        f.write("• liftover_analysis_summary.txt - This report\n\n")
-        
-        f.write("ANALYSIS FOCUS\n")
-        f.write("-" * 15 + "\n")
-        f.write("This analysis focuses on liftover tool quality control comparing CrossMap\n")
-        f.write("and bcftools performance. For detailed VEP consequence analysis and variant\n")
-        f.write("prioritization, use variant_prioritizer.py which provides comprehensive\n")
-        f.write("clinical review outputs with priority scoring.\n\n")
-        
-        f.write("COORDINATE SYSTEM NOTES\n")
-        f.write("-" * 25 + "\n")
-        f.write("• All coordinates use VEP normalization\n")
-        f.write("• SNVs: original input coordinates\n")
-        f.write("• Indels: original input coordinates + 1\n")
-        f.write("• Position differences calculated on normalized coordinates\n\n")
-        
-        f.write("BCFTOOLS SWAP VALUE INTERPRETATION\n")
-        f.write("-" * 35 + "\n")
-        f.write("The 'swap' column in the comparison data contains bcftools liftover status:\n")
-        f.write("• NA: No action needed; alleles already matched reference genome\n")
-        f.write("• 1: REF and ALT alleles were swapped to match reference genome\n")
-        f.write("• -1: REF and ALT alleles could not be swapped (ambiguous/invalid)\n\n")
-        f.write("This information is crucial for understanding allele orientation changes\n")
-        f.write("during genome build liftover and potential impact on variant interpretation.\n")
+    out = []
+    out.append("GENOMIC VARIANT LIFTOVER TOOL ANALYSIS SUMMARY\n")
+    out.append("=" * 60 + "\n\n")
+    
+    # Database overview
+    out.append("DATABASE OVERVIEW\n")
+    out.append("-" * 20 + "\n")
+    out.append(f"Total variants analyzed: {total_variants:,}\n")
+    out.append(f"Position match rate: {pos_match_rate:.1%}\n")
+    out.append(f"Genotype match rate: {gt_match_rate:.1%}\n")
+    out.append(f"Analysis performed on VEP-normalized coordinates\n\n")
+    
+    # Mapping status breakdown
+    out.append("LIFTOVER TOOL PERFORMANCE\n")
+    out.append("-" * 30 + "\n")
+    out.append("Breakdown by mapping status:\n")
+    out.append(mapping_stats.to_string(index=False))
+    out.append("\n\n")
+    
+    # Match category breakdown
+    out.append("VARIANT MATCH CATEGORIES\n")
+    out.append("-" * 25 + "\n")
+    for category, count in match_counts.items():
+        pct = count / total_compared * 100
+        out.append(f"{category}: {count:,} ({pct:.1f}%)\n")
+    out.append("\n")
+    
+    # Concordance breakdown
+    out.append("CONCORDANCE ANALYSIS\n")
+    out.append("-" * 20 + "\n")
+    for status, count in concordance_summary.items():
+        pct = count / total_compared * 100
+        out.append(f"{status}: {count:,} ({pct:.1f}%)\n")
+    out.append("\n")
+    
+    # Flip/Swap analysis
+    if flip_swap_summary is not None and len(flip_swap_summary) > 0:
+        out.append("FLIP/SWAP ANALYSIS (Mismatched Variants Only)\n")
+        out.append("-" * 45 + "\n")
+        out.append(f"Total mismatched variants: {total_mismatched:,}\n\n")
+        out.append("BCFtools SWAP value meanings:\n")
+        out.append("• NA: No action needed; alleles already matched reference genome\n")
+        out.append("• 1: REF and ALT alleles were swapped to match reference genome\n")
+        out.append("• -1: REF and ALT alleles could not be swapped (ambiguous/invalid)\n\n")
+        out.append("Flip/Swap category breakdown:\n")
+        out.append("• FLIP: Strand flip occurred\n")
+        out.append("• SWAP: REF/ALT alleles were swapped during liftover\n")
+        out.append("• SWAP_FAILED: Swap attempted but failed (ambiguous alleles)\n")
+        out.append("• FLIP+SWAP: Both strand flip and allele swap occurred\n")
+        out.append("• NONE: No flip or swap operations needed\n\n")
+        for category, count in flip_swap_summary.items():
+            pct = count / total_mismatched * 100
+            out.append(f"{category}: {count:,} ({pct:.1f}%)\n")
+        out.append("\n")
+    
+    # Generated files
+    out.append("GENERATED OUTPUT FILES\n")
+    out.append("-" * 25 + "\n")
+    out.append("• liftover_analysis.png - Liftover tool performance visualization\n")
+    out.append("• position_differences_analysis.png - Coordinate discrepancy analysis\n")
+    out.append("• liftover_analysis_summary.txt - This report\n\n")
+    
+    out.append("ANALYSIS FOCUS\n")
+    out.append("-" * 15 + "\n")
+    out.append("This analysis focuses on liftover tool quality control comparing CrossMap\n")
+    out.append("and bcftools performance. For detailed VEP consequence analysis and variant\n")
+    out.append("prioritization, use variant_prioritizer.py which provides comprehensive\n")
+    out.append("clinical review outputs with priority scoring.\n\n")
+    
+    out.append("COORDINATE SYSTEM NOTES\n")
+    out.append("-" * 25 + "\n")
+    out.append("• All coordinates use VEP normalization\n")
+    out.append("• SNVs: original input coordinates\n")
+    out.append("• Indels: original input coordinates + 1\n")
+    out.append("• Position differences calculated on normalized coordinates\n\n")
+    
+    out.append("BCFTOOLS SWAP VALUE INTERPRETATION\n")
+    out.append("-" * 35 + "\n")
+    out.append("The 'swap' column in the comparison data contains bcftools liftover status:\n")
+    out.append("• NA: No action needed; alleles already matched reference genome\n")
+    out.append("• 1: REF and ALT alleles were swapped to match reference genome\n")
+    out.append("• -1: REF and ALT alleles could not be swapped (ambiguous/invalid)\n\n")
+    out.append("This information is crucial for understanding allele orientation changes\n")
+    out.append("during genome build liftover and potential impact on variant interpretation.\n")
+
+    summary_file.write_text(''.join(out))
     
     print(f"✓ Comprehensive summary report saved to: {summary_file}")
     return summary_file
@@ -774,13 +769,10 @@ NOTE: VEP consequence analysis has been moved to variant_prioritizer.py
         conn = connect_database(db_path)
         print(f"✓ Connected to database: {db_path}")
         
-        # Run liftover analysis modules
+        # Read the plot data up front so every query finishes before rendering
         if create_plots:
-            print("Running liftover analysis with visualizations...")
-            analyze_cross_variables(conn, output_dir)
-            analyze_position_differences(conn, output_dir)
-        else:
-            print("Running analysis without plots...")
+            cross_variable_df = load_cross_variable_data(conn)
+            position_difference_df = load_position_difference_data(conn)
         
         # Generate comprehensive summary
         generate_comprehensive_report(conn, output_dir)
@@ -796,8 +788,17 @@ NOTE: VEP consequence analysis has been moved to variant_prioritizer.py
                 json.dump(liftover_data, f, indent=2, default=str)
             print(f"✓ JSON data exported to: {json_file}")
         
+        # Release the database (and its page cache) before matplotlib allocates figures
         conn.close()
         
+        # Run liftover analysis modules
+        if create_plots:
+            print("Running liftover analysis with visualizations...")
+            analyze_cross_variables(cross_variable_df, output_dir)
+            analyze_position_differences(position_difference_df, output_dir)
+        else:
+            print("Running analysis without plots...")
+        
         print(f"\n=== LIFTOVER ANALYSIS COMPLETED ===")
         print(f"✓ Results saved in: {output_dir}")
         print(f"\nGenerated files:")
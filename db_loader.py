@@ -555,8 +555,10 @@ def add_unique_constraints_and_indexes(db_path):
         
         # Comparison table indexes
         cursor.execute("CREATE INDEX idx_comp_bcftools ON comparison(bcftools_hg38_chrom, bcftools_hg38_pos)")
-        cursor.execute("CREATE INDEX idx_comp_mapping_status ON comparison(mapping_status)")
-        cursor.execute("CREATE INDEX idx_comp_matches ON comparison(pos_match, gt_match)")
+        # Covering indexes: the liftover QC aggregates (match categories, flip/swap
+        # breakdown, per-mapping-status rates) read these instead of the table
+        cursor.execute("CREATE INDEX idx_comp_mapping_status ON comparison(mapping_status, pos_match, gt_match)")
+        cursor.execute("CREATE INDEX idx_comp_matches ON comparison(pos_match, gt_match, flip, swap)")
         
         # VEP table indexes
         for build in ['hg19', 'hg38']:
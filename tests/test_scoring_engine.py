@@ -0,0 +1,264 @@
+"""
+Tests for the clinical scoring engine
+
+Run from the repository root:
+    python -m unittest discover -s tests -t .
+"""
+
+import os
+import subprocess
+import sys
+import textwrap
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from analysis import scoring_engine
+from config.scoring_config import BASE_SCORES, PRIORITY_THRESHOLDS, CLINICAL_CHANGE_TYPES, CLINICAL_OVERRIDE
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def baseline_priority_category(score, score_details):
+    """Category rule of the original row-by-row scorer"""
+    if score == 0:
+        return 'CONCORDANT'
+    elif score <= BASE_SCORES['gene_changes']:
+        gene_only = all('gene changes' in detail.lower() for detail in score_details if detail)
+        if gene_only:
+            return 'CONCORDANT'
+    for category in ['CRITICAL', 'MODERATE', 'LOW']:
+        if score >= PRIORITY_THRESHOLDS[category]:
+            return category
+    return 'LOW'
+
+
+def baseline_score_row(row):
+    """
+    The original iterrows scorer for one variant (reference for the vectorized engine)
+
+    Returns:
+        tuple: (priority_score, priority_category, score_breakdown, Clinical_Change_Direction)
+    """
+    base = BASE_SCORES
+    types = CLINICAL_CHANGE_TYPES
+    score = 0
+    details = []
+
+    def add(points, label):
+        nonlocal score
+        score += points
+        details.append(f"{label} ({points})")
+
+    transcript_status = row.get('transcript_crossbuild_status', '')
+    if transcript_status == 'MANE_hg38_Only':
+        add(base['transcript_mismatch'], "Transcript mismatch")
+    elif transcript_status == 'No_Matching_Transcripts':
+        add(base['no_matching_transcripts'], "No matching transcripts")
+    elif transcript_status == 'No_Transcripts':
+        add(base['no_transcripts'], "No transcripts")
+
+    if transcript_status not in ['No_Matching_Transcripts', 'No_Transcripts']:
+        if row.get('priority_hgvsc_concordance') == 'Mismatch':
+            add(base['priority_hgvsc_mismatch'], "HGVSc mismatch")
+        elif row.get('priority_hgvsc_concordance') == 'No_Analysis':
+            add(base['missing_hgvs_data'], "Missing HGVSc data")
+        if row.get('priority_hgvsp_concordance') == 'Mismatch':
+            add(base['priority_hgvsp_mismatch'], "HGVSp mismatch")
+        elif row.get('priority_hgvsp_concordance') == 'No_Analysis':
+            add(base['missing_hgvs_data'], "Missing HGVSp data")
+
+    clin_change = str(row.get('clin_sig_change', ''))
+    if clin_change in types['pathogenic_benign_flip']:
+        add(base['pathogenic_benign_flip'], "Pathogenic↔Benign change")
+    elif clin_change in types['pathogenic_vus_change']:
+        add(base['pathogenic_vus_change'], "Pathogenic↔VUS change")
+    elif clin_change in types['vus_benign_change']:
+        add(base['vus_benign_change'], "VUS↔Benign change")
+    elif clin_change in types['minor_clinical_changes']:
+        add(base['minor_clinical_changes'], "Minor clinical change")
+    elif clin_change == 'NONE' or clin_change.startswith('STABLE_NONE'):
+        add(base['missing_clinical_data'], "Missing clinical data")
+
+    if row.get('has_worst_consequence_difference') == 'YES':
+        if row.get('impact_changes', 0) > 0:
+            add(base['serious_consequence_difference'], "Serious consequence difference")
+        else:
+            add(base['minor_clinical_changes'], "Minor consequence difference")
+
+    if row.get('gene_changes', 0) > 0:
+        add(base['gene_changes'], "Gene changes")
+    if row.get('impact_changes', 0) > 0:
+        add(base['impact_changes'], "Impact changes")
+    if 'TO' in str(row.get('sift_change', '')):
+        add(base['prediction_changes'], "SIFT change")
+    if 'TO' in str(row.get('polyphen_change', '')):
+        add(base['prediction_changes'], "PolyPhen change")
+
+    predictions = [str(row.get(col, '')).lower() for col in ['hg19_sift', 'hg19_polyphen', 'hg38_sift', 'hg38_polyphen']]
+    is_low_modifier_impact = (row.get('hg19_impact') in ['MODIFIER', 'LOW'] and
+                              row.get('hg38_impact') in ['MODIFIER', 'LOW'])
+    has_benign_evidence = (row.get('hg19_clin_sig_normalized') == 'BENIGN' or
+                           row.get('hg38_clin_sig_normalized') == 'BENIGN' or
+                           any('benign' in prediction for prediction in predictions))
+    is_benign_variant = is_low_modifier_impact and has_benign_evidence
+    has_pathogenic_evidence = (
+        row.get('hg19_clin_sig_normalized') == 'PATHOGENIC' or
+        row.get('hg38_clin_sig_normalized') == 'PATHOGENIC' or
+        row.get('hg19_impact') == 'HIGH' or row.get('hg38_impact') == 'HIGH' or
+        'deleterious' in predictions[0] or 'deleterious' in predictions[2] or
+        'probably_damaging' in predictions[1] or 'probably_damaging' in predictions[3]
+    )
+
+    if row.get('pos_match', 1) == 0:
+        add(base['position_mismatch'], "Position mismatch")
+    pos_diff = row.get('pos_difference', 0)
+    if pos_diff > 100:
+        add(base['position_difference_large'], "Large position difference")
+    elif pos_diff > 10:
+        add(base['position_difference_moderate'], "Moderate position difference")
+    if row.get('gt_match', 1) == 0:
+        add(base['genotype_mismatch'], "Genotype mismatch")
+    if str(row.get('swap', 'NA')) == '1':
+        add(base['ref_alt_swap'], "Ref/Alt swap")
+
+    if is_benign_variant:
+        score *= CLINICAL_OVERRIDE['benign_reduction_factor']
+        details.append("Benign evidence override (×0.1)")
+    elif has_pathogenic_evidence:
+        score *= CLINICAL_OVERRIDE['pathogenic_boost_factor']
+        details.append("Pathogenic evidence boost (×2.0)")
+
+    hg19 = row.get('hg19_clin_sig_normalized', '')
+    hg38 = row.get('hg38_clin_sig_normalized', '')
+    if hg19 == hg38:
+        direction = f'Stable {hg19}' if hg19 else 'Stable NONE'
+    elif hg38 == 'PATHOGENIC':
+        direction = '→ PATHOGENIC'
+    elif hg19 == 'PATHOGENIC':
+        direction = 'FROM PATHOGENIC →'
+    elif hg38 == 'BENIGN':
+        direction = '→ BENIGN'
+    elif hg19 == 'BENIGN':
+        direction = 'FROM BENIGN →'
+    else:
+        direction = 'Other Transitions'
+
+    return (int(round(score)), baseline_priority_category(score, details),
+            '; '.join(details) if details else 'No significant issues', direction)
+
+
+def synthetic_analysis(n_variants=3000, seed=0):
+    """
+    Random VEP analysis rows covering every scoring branch
+
+    Includes missing positions and impact counts (NaN), position differences on
+    the 10/100 boundaries, and rows whose only issue is a gene symbol change.
+    """
+    rng = np.random.default_rng(seed)
+    clinical_changes = [change for changes in CLINICAL_CHANGE_TYPES.values() for change in changes]
+
+    def pick(values):
+        return pd.Series(values, dtype=object).iloc[rng.integers(0, len(values), n_variants)].to_numpy()
+
+    df = pd.DataFrame({
+        'transcript_crossbuild_status': pick(['MANE_Both', 'MANE_hg38_Only', 'No_Matching_Transcripts',
+                                              'No_Transcripts', 'Other', None]),
+        'priority_hgvsc_concordance': pick(['Match', 'Mismatch', 'No_Analysis', None]),
+        'priority_hgvsp_concordance': pick(['Match', 'Mismatch', 'No_Analysis', None]),
+        'clin_sig_change': pick(clinical_changes + ['NONE', 'STABLE_NONE', 'STABLE_PATHOGENIC', '', None]),
+        'has_worst_consequence_difference': pick(['YES', 'NO', None]),
+        'impact_changes': pick([0, 1, 2, np.nan]).astype(float),
+        'gene_changes': pick([0, 1, np.nan]).astype(float),
+        'sift_change': pick(['', 'TOLERATED_TO_DELETERIOUS', None]),
+        'polyphen_change': pick(['', 'BENIGN_TO_PROBABLY_DAMAGING', None]),
+        'pos_match': pick([0, 1]).astype(int),
+        'gt_match': pick([0, 1]).astype(int),
+        'pos_difference': pick([0, 5, 10, 11, 50, 100, 101, 500, np.nan]).astype(float),
+        'swap': pick(['1', '-1', 'NA', '']),
+        'hg19_impact': pick(['HIGH', 'MODERATE', 'LOW', 'MODIFIER', None]),
+        'hg38_impact': pick(['HIGH', 'MODERATE', 'LOW', 'MODIFIER', None]),
+        'hg19_clin_sig_normalized': pick(['PATHOGENIC', 'BENIGN', 'VUS', 'NONE', 'OTHER']),
+        'hg38_clin_sig_normalized': pick(['PATHOGENIC', 'BENIGN', 'VUS', 'NONE', 'OTHER']),
+        'hg19_sift': pick(['deleterious(0.01)', 'tolerated(0.3)', '', None]),
+        'hg38_sift': pick(['deleterious(0.01)', 'tolerated(0.3)', '', None]),
+        'hg19_polyphen': pick(['probably_damaging(0.99)', 'possibly_damaging(0.5)', 'benign(0.01)', '', None]),
+        'hg38_polyphen': pick(['probably_damaging(0.99)', 'possibly_damaging(0.5)', 'benign(0.01)', '', None]),
+    })
+
+    # Gene symbol change as the only issue, without and with a benign override
+    gene_only = {
+        'transcript_crossbuild_status': 'MANE_Both', 'priority_hgvsc_concordance': 'Match',
+        'priority_hgvsp_concordance': 'Match', 'clin_sig_change': 'STABLE_VUS',
+        'has_worst_consequence_difference': 'NO', 'impact_changes': 0.0, 'gene_changes': 1.0,
+        'sift_change': '', 'polyphen_change': '', 'pos_match': 1, 'gt_match': 1,
+        'pos_difference': np.nan, 'swap': 'NA', 'hg19_impact': 'MODERATE', 'hg38_impact': 'MODERATE',
+        'hg19_clin_sig_normalized': 'VUS', 'hg38_clin_sig_normalized': 'VUS',
+        'hg19_sift': 'tolerated(0.3)', 'hg38_sift': 'tolerated(0.3)',
+        'hg19_polyphen': 'possibly_damaging(0.5)', 'hg38_polyphen': 'possibly_damaging(0.5)',
+    }
+    gene_only_benign = {**gene_only, 'hg19_impact': 'LOW', 'hg38_impact': 'LOW',
+                        'hg38_clin_sig_normalized': 'BENIGN'}
+    gene_only_pathogenic = {**gene_only, 'hg38_impact': 'HIGH', 'pos_difference': 0.0}
+    extra = pd.DataFrame([gene_only, gene_only_benign, gene_only_pathogenic] * 5)
+    return pd.concat([df, extra], ignore_index=True)
+
+
+class ScoringEquivalenceTest(unittest.TestCase):
+    """The vectorized scorer reproduces the original row-by-row scorer"""
+
+    SCORED_COLUMNS = ['priority_score', 'priority_category', 'score_breakdown', 'Clinical_Change_Direction']
+
+    def assert_matches_baseline(self, analysis):
+        expected = pd.DataFrame([baseline_score_row(row) for _, row in analysis.iterrows()],
+                                columns=self.SCORED_COLUMNS)
+        scored = scoring_engine.ClinicalScorer().calculate_scores_from_analysis(analysis)
+        actual = scored[self.SCORED_COLUMNS].astype({'priority_score': int, 'priority_category': object})
+        pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+    def test_scores_match_baseline(self):
+        self.assert_matches_baseline(synthetic_analysis())
+
+    def test_scores_match_baseline_without_numba(self):
+        with mock.patch.object(scoring_engine, 'NUMBA_AVAILABLE', False):
+            self.assert_matches_baseline(synthetic_analysis(seed=1))
+
+    def test_gene_only_rows_are_concordant(self):
+        analysis = synthetic_analysis(n_variants=0)
+        scored = scoring_engine.ClinicalScorer().calculate_scores_from_analysis(analysis)
+        # Plain gene-only rows are CONCORDANT; an override detail disqualifies the rule
+        self.assertEqual(list(scored['priority_category'][:3]), ['CONCORDANT', 'LOW', 'LOW'])
+
+
+class GpuScoringTest(unittest.TestCase):
+    """The CUDA kernel, run on numba's CUDA simulator, matches the CPU kernel"""
+
+    @unittest.skipUnless(scoring_engine.CUDA_AVAILABLE, "numba.cuda is not installed")
+    def test_cuda_kernel_matches_cpu_under_simulator(self):
+        # NUMBA_ENABLE_CUDASIM must be set before numba is imported: run in a fresh interpreter
+        code = textwrap.dedent("""
+            import numpy as np
+            from analysis import scoring_engine
+
+            assert scoring_engine.gpu_scoring_available()
+            rng = np.random.default_rng(0)
+            n_variants, n_components = 300, 12  # more variants than one block of threads
+            flags = rng.integers(0, 2, size=(n_variants, n_components)).astype(np.int8)
+            weights = rng.integers(1, 30, size=n_components).astype(np.float64)
+            benign = rng.random(n_variants) < 0.3
+            pathogenic = ~benign & (rng.random(n_variants) < 0.3)
+            args = (flags, weights, benign, pathogenic, 0.1, 2.0)
+            np.testing.assert_allclose(scoring_engine.score_components(*args, use_gpu=True),
+                                       scoring_engine.score_components(*args, use_gpu=False))
+        """)
+        env = {**os.environ, 'NUMBA_ENABLE_CUDASIM': '1'}
+        result = subprocess.run([sys.executable, '-c', code], cwd=REPO_ROOT, env=env,
+                                capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
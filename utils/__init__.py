@@ -9,7 +9,10 @@ from .clinical_utils import (
     is_pathogenic_clinical_significance,
     is_benign_clinical_significance,
     parse_sift_prediction,
-    parse_polyphen_prediction
+    parse_polyphen_prediction,
+    as_clinical_category,
+    count_clinical_categories,
+    clinical_transition_matrix
 )
 
 from .transcript_utils import (
@@ -18,11 +21,22 @@ from .transcript_utils import (
 
 from .impact_utils import (
     get_impact_numeric_value,
+    encode_impact_levels,
+    decode_impact_level,
     calculate_impact_transition_magnitude
 )
 
 from .data_utils import (
-    safe_int_convert
+    safe_int_convert,
+    select_top_rows,
+    convert_to_arrow_strings,
+    count_categories,
+    yes_no_flags,
+    fill_missing_blank,
+    write_csv,
+    write_xlsx,
+    connect_read_only,
+    find_missing_tables
 )
 
 __all__ = [
@@ -31,14 +45,28 @@ __all__ = [
     'is_benign_clinical_significance', 
     'parse_sift_prediction',
     'parse_polyphen_prediction',
+    'as_clinical_category',
+    'count_clinical_categories',
+    'clinical_transition_matrix',
     
     # Transcript utilities
     'extract_genotype_from_alleles',
     
     # Impact utilities
     'get_impact_numeric_value',
+    'encode_impact_levels',
+    'decode_impact_level',
     'calculate_impact_transition_magnitude',
     
     # Data utilities
-    'safe_int_convert'
+    'safe_int_convert',
+    'select_top_rows',
+    'convert_to_arrow_strings',
+    'count_categories',
+    'yes_no_flags',
+    'fill_missing_blank',
+    'write_csv',
+    'write_xlsx',
+    'connect_read_only',
+    'find_missing_tables'
 ]
@@ -5,9 +5,18 @@ Functions for parsing and analyzing clinical significance, pathogenicity predict
 and other clinical evidence from variant annotations.
 """
 
+import numpy as np
 import pandas as pd
 import re
-from config.constants import CLINICAL_SIGNIFICANCE_NORMALIZATION, PATHOGENIC_TERMS, BENIGN_TERMS
+from config.constants import (
+    CLINICAL_SIGNIFICANCE_NORMALIZATION,
+    NORMALIZED_CLINICAL_CATEGORIES,
+    PATHOGENIC_TERMS,
+    BENIGN_TERMS
+)
+
+# Low-cardinality dtype for normalized clinical significance columns
+CLINICAL_CATEGORY_DTYPE = pd.CategoricalDtype(NORMALIZED_CLINICAL_CATEGORIES)
 
 
 def normalize_clinical_significance(clin_sig):
@@ -132,6 +141,44 @@ def normalize_clinical_significance(clin_sig):
     return 'VUS'
 
 
+def as_clinical_category(normalized_clin_sig):
+    """
+    Convert a normalized clinical significance column to Categorical dtype
+
+    Equality tests, value_counts and groupby then operate on int8 codes.
+    Note that value_counts also reports unobserved categories (count 0).
+    """
+    return normalized_clin_sig.astype(CLINICAL_CATEGORY_DTYPE)
+
+
+def count_clinical_categories(normalized_clin_sig):
+    """
+    Count normalized clinical significance categories with a single bincount pass
+
+    Returns:
+        dict: {category: count} for every normalized category (0 when unobserved)
+    """
+    codes = as_clinical_category(normalized_clin_sig).cat.codes.to_numpy()
+    counts = np.bincount(codes[codes >= 0], minlength=len(NORMALIZED_CLINICAL_CATEGORIES))
+    return dict(zip(NORMALIZED_CLINICAL_CATEGORIES, counts.tolist()))
+
+
+def clinical_transition_matrix(hg19_clin_sig, hg38_clin_sig):
+    """
+    Count hg19→hg38 normalized clinical significance transitions in one bincount pass
+
+    Returns:
+        np.ndarray: (categories x categories) counts, rows=hg19, columns=hg38,
+        both in NORMALIZED_CLINICAL_CATEGORIES order (pairs with a missing value are skipped)
+    """
+    n_categories = len(NORMALIZED_CLINICAL_CATEGORIES)
+    hg19_codes = as_clinical_category(hg19_clin_sig).cat.codes.to_numpy().astype(np.intp)
+    hg38_codes = as_clinical_category(hg38_clin_sig).cat.codes.to_numpy().astype(np.intp)
+    valid = (hg19_codes >= 0) & (hg38_codes >= 0)
+    pair_codes = hg19_codes[valid] * n_categories + hg38_codes[valid]
+    return np.bincount(pair_codes, minlength=n_categories * n_categories).reshape(n_categories, n_categories)
+
+
 def is_pathogenic_clinical_significance(clin_sig):
     """Check if clinical significance indicates pathogenic variant (legacy function)"""
     if pd.isna(clin_sig) or clin_sig in ['', '-', 'nan']:
@@ -5,13 +5,162 @@ Functions for data transformation, type conversion, and other general
 data processing tasks.
 """
 
+import sqlite3
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
 
+# Optional Arrow-backed string columns (faster vectorized equality) and columnar CSV writer
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Optional streaming .xlsx writer (constant_memory mode flushes each row as it is written)
+try:
+    import xlsxwriter  # noqa: F401
+    XLSXWRITER_AVAILABLE = True
+except ImportError:
+    XLSXWRITER_AVAILABLE = False
+
 
 def safe_int_convert(series):
     """Convert float to int, handling NaN values"""
     return series.apply(lambda x: int(x) if pd.notna(x) and x != '' else '')
 
+def select_top_rows(df, k, column):
+    """
+    Select the k rows with the highest values in column, ordered descending
+
+    Uses DataFrame.nlargest (partial selection) so only the top k rows are
+    ordered instead of sorting the full dataframe. Ties keep their original row order.
+    """
+    if k <= 0:
+        return df.iloc[:0]
+    return df.nlargest(k, column, keep='first')
+
+def convert_to_arrow_strings(df, columns):
+    """
+    Convert string columns to the Arrow-backed 'string[pyarrow]' dtype in place
+
+    Equality and .isin comparisons on these columns then run in Arrow compute
+    kernels instead of per-object Python comparisons. Columns that are missing
+    or contain nulls are left untouched so boolean masks stay non-nullable.
+    No-op when pyarrow is not installed.
+    """
+    if not PYARROW_AVAILABLE:
+        return df
+
+    for col in columns:
+        if col in df.columns and not df[col].isna().any():
+            df[col] = df[col].astype('string[pyarrow]')
+    return df
+
+def fill_missing_blank(df):
+    """
+    Replace missing values with '' (DataFrame.fillna('')) in only the columns that have any
+
+    Columns without missing values are passed through untouched instead of
+    being re-processed by a full-frame fillna.
+    """
+    missing_columns = df.columns[df.isna().any().to_numpy()]
+    if len(missing_columns) == 0:
+        return df
+    return df.fillna(dict.fromkeys(missing_columns, ''))
+
+# Rows stringified and handed to the Arrow CSV writer per batch
+CSV_WRITE_BATCH_ROWS = 65536
+
+def write_csv(df, path, batch_rows=CSV_WRITE_BATCH_ROWS):
+    """
+    Write a dataframe to CSV without the index, using Arrow's columnar writer when available
+
+    Cells are rendered with str() first so values read back exactly as with
+    DataFrame.to_csv; Arrow quotes every string cell instead of only those that
+    need it. Rows are streamed through one CSVWriter in batches, so only a
+    batch-sized string copy of the frame exists at a time. Falls back to
+    DataFrame.to_csv (also written in batch_rows chunks) when pyarrow is not installed.
+    """
+    if not PYARROW_AVAILABLE:
+        df.to_csv(path, index=False, chunksize=batch_rows)
+        return
+
+    schema = pa.schema([(str(col), pa.string()) for col in df.columns])
+    with pacsv.CSVWriter(str(path), schema) as writer:
+        for start in range(0, len(df), batch_rows):
+            batch = df.iloc[start:start + batch_rows].astype(str)
+            writer.write_table(pa.Table.from_pandas(batch, schema=schema, preserve_index=False))
+
+def write_xlsx(df, path, sheet_name='Prioritized variants'):
+    """
+    Write a dataframe to a single-sheet .xlsx file without the index (requires xlsxwriter)
+
+    Uses xlsxwriter in constant_memory mode: each row is flushed to disk once
+    written, so memory stays at one row instead of the whole sheet. openpyxl
+    keeps every cell in memory and is several times slower, so it is not used.
+    """
+    with pd.ExcelWriter(path, engine='xlsxwriter',
+                        engine_kwargs={'options': {'constant_memory': True}}) as writer:
+        df.to_excel(writer, sheet_name=sheet_name, index=False)
+
+# Read-only tuning applied to every analysis connection
+READ_PRAGMAS = (
+    "PRAGMA query_only = ON",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -65536",    # 64 MB page cache
+    "PRAGMA mmap_size = 268435456"   # 256 MB memory-mapped reads
+)
+
+def connect_read_only(db_path):
+    """
+    Open an SQLite database read-only (mode=ro URI) with READ_PRAGMAS applied
+
+    Writes fail at the connection level, and the mmap_size pragma serves
+    pages straight from the mapping. Journal mode and synchronous are left
+    alone: they only affect writes, and switching to WAL needs write access.
+    """
+    conn = sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+    for pragma in READ_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+def find_missing_tables(conn, required_tables):
+    """
+    Return the required tables that do not exist, in the given order
+
+    One sqlite_master query filtered to the required names, so only those
+    names (never the full table/index catalogue) come back to Python.
+    """
+    placeholders = ', '.join('?' * len(required_tables))
+    present = {name for (name,) in conn.execute(
+        f"SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ({placeholders})",
+        list(required_tables)
+    )}
+    return [table for table in required_tables if table not in present]
+
+# Lookup table for YES/NO display flags (index 0 = NO, 1 = YES)
+YES_NO = np.array(['NO', 'YES'], dtype=object)
+
+def yes_no_flags(mask):
+    """Convert a boolean mask (Series or array) to a YES/NO object array in one lookup"""
+    return YES_NO[np.asarray(mask, dtype=bool).view(np.int8)]
+
+def count_categories(series):
+    """
+    Count each category of a categorical series with a single np.bincount pass
+
+    Returns:
+        dict: {category: count} in category order (0 when unobserved)
+    """
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype('category')
+    codes = series.cat.codes.to_numpy()
+    counts = np.bincount(codes[codes >= 0], minlength=len(series.cat.categories))
+    return dict(zip(series.cat.categories, counts.tolist()))
+
 def clean_string(s):
     """
     Clean strings for robust genomics data comparison
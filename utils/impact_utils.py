@@ -5,11 +5,42 @@ Functions for calculating impact magnitudes, numeric values, and transitions
 for clinical significance assessment.
 """
 
+import numpy as np
+import pandas as pd
+
+from config.constants import IMPACT_NUMERIC_VALUES
+
+# Code used for missing/unknown impact levels in encoded impact columns
+IMPACT_NONE_CODE = 0
+
+# Reverse lookup of IMPACT_NUMERIC_VALUES for decoding encoded impact columns
+IMPACT_LABELS_BY_CODE = {value: impact for impact, value in IMPACT_NUMERIC_VALUES.items()}
+
+# Impact labels as categories, and numeric value by (categorical code + 1); slot 0 is missing/unknown
+IMPACT_CATEGORIES = list(IMPACT_NUMERIC_VALUES)
+IMPACT_CODE_LOOKUP = np.array(
+    [IMPACT_NONE_CODE] + [IMPACT_NUMERIC_VALUES[impact] for impact in IMPACT_CATEGORIES], dtype=np.int8
+)
+
 
 def get_impact_numeric_value(impact):
     """Convert impact to numeric value for magnitude calculation"""
-    impact_values = {'HIGH': 4, 'MODERATE': 3, 'LOW': 2, 'MODIFIER': 1}
-    return impact_values.get(impact, 0)
+    return IMPACT_NUMERIC_VALUES.get(impact, IMPACT_NONE_CODE)
+
+
+def encode_impact_levels(impacts):
+    """
+    Encode an impact column as int8 numeric values (vectorized get_impact_numeric_value)
+
+    HIGH=4, MODERATE=3, LOW=2, MODIFIER=1, missing/unknown=0
+    """
+    codes = pd.Categorical(impacts, categories=IMPACT_CATEGORIES).codes
+    return pd.Series(IMPACT_CODE_LOOKUP[codes + 1], index=impacts.index, name=impacts.name)
+
+
+def decode_impact_level(code):
+    """Convert an encoded impact value back to its impact label ('NONE' for missing)"""
+    return IMPACT_LABELS_BY_CODE.get(code, 'NONE')
 
 
 def calculate_impact_transition_magnitude(hg19_impact, hg38_impact):
@@ -166,13 +166,14 @@ class ReportGenerator:
     def _collect_variant_data(self):
         """Load variant data for clinical evidence table : Show only variants with actual changes"""
         csv_file = self.input_dir / 'prioritized_variants.csv'
-        if csv_file.exists():
-            df = pd.read_csv(csv_file)
+        parquet_file = self.input_dir / 'prioritized_variants.parquet'
+        if csv_file.exists() or parquet_file.exists():
+            df = pd.read_csv(csv_file) if csv_file.exists() else pd.read_parquet(parquet_file)
             
             # Top 10 variants with clinical evidence focus
             if len(df) > 0:
                 # Filter to variants with meaningful clinical changes only
-                has_changes_mask = pd.Series([False] * len(df))
+                has_changes_mask = pd.Series(False, index=df.index)
 
                 # Clinical significance changes
                 if 'Has_Clinical_Change' in df.columns:
@@ -182,30 +183,24 @@ class ReportGenerator:
                 if 'Has_Consequence_Change' in df.columns:
                     has_changes_mask |= (df['Has_Consequence_Change'] == 'YES')
 
-                # HGVS discordance (replacing Has_Impact_Change)
+                # HGVS discordance (replacing Has_Impact_Change): any non-empty item in the
+                # comma-separated list, checked column-wise with string ops
                 if 'HGVSc_MATCHED_discordant' in df.columns:
-                    def has_hgvs_discordance(value):
-                        """Check if there are discordant HGVS matches"""
-                        if pd.isna(value) or str(value).strip() in ['', '-', 'nan']:
-                            return False
-                        try:
-                            # Count non-empty items in comma-separated list
-                            items = [item.strip() for item in str(value).split(',') if item.strip()]
-                            return len(items) > 0
-                        except:
-                            return False
-                    
-                    has_changes_mask |= df['HGVSc_MATCHED_discordant'].apply(has_hgvs_discordance)
+                    discordant = df['HGVSc_MATCHED_discordant']
+                    text = discordant.astype(str).str.strip()
+                    has_items = text.str.replace(',', '', regex=False).str.strip() != ''
+                    has_changes_mask |= discordant.notna() & ~text.isin(['', '-', 'nan']) & has_items
                 
                 # Filter to variants with changes
                 df_with_changes = df[has_changes_mask]
                 print(f"Filtered to {len(df_with_changes)} variants with actual changes (from {len(df)} total)")
                 
-                # Sort by Priority_Score descending to get highest priority first
+                # Top 10 by Priority_Score descending (partial selection, ties keep file order)
+                top_count = 10
                 if 'Priority_Score' in df_with_changes.columns and len(df_with_changes) > 0:
-                    df_sorted = df_with_changes.sort_values('Priority_Score', ascending=False)
+                    df_sorted = df_with_changes.nlargest(top_count, 'Priority_Score', keep='first')
                 elif 'Rank' in df_with_changes.columns and len(df_with_changes) > 0:
-                    df_sorted = df_with_changes.sort_values('Rank', ascending=True)  # Lower rank = higher priority
+                    df_sorted = df_with_changes.nsmallest(top_count, 'Rank', keep='first')  # Lower rank = higher priority
                 else:
                     df_sorted = df_with_changes  # Use original order if no sorting column available
                 
@@ -223,7 +218,7 @@ class ReportGenerator:
                 
                 # Take top 10 highest priority variants with changes
                 if len(df_sorted) > 0:
-                    top_variants = df_sorted[available_columns].head(10)
+                    top_variants = df_sorted.head(top_count)[available_columns]
                     self.report_data['top_variants'] = top_variants.to_dict('records')
                 else:
                     print("No variants with changes found")
@@ -5,10 +5,14 @@ Calculates structured summary data from analysis results for both
 liftover QC analysis and variant prioritization.
 """
 
+import numpy as np
 import pandas as pd
 from datetime import datetime
 
+from config.constants import NORMALIZED_CLINICAL_CATEGORIES
 from config.scoring_config import PRIORITY_CATEGORIES
+from utils.clinical_utils import clinical_transition_matrix
+from utils.data_utils import count_categories
 
 
 class SummaryDataCalculator:
@@ -17,25 +21,27 @@ class SummaryDataCalculator:
     def calculate_liftover_summary(self, conn):
         """Calculate liftover QC summary data (for db_analyzer.py)"""
         
-        # Basic database statistics
-        total_variants = pd.read_sql_query("SELECT COUNT(*) as count FROM comparison", conn).iloc[0]['count']
-        
-        pos_match_rate = pd.read_sql_query("""
-            SELECT AVG(pos_match) as rate FROM comparison
-        """, conn).iloc[0]['rate']
+        # Basic statistics and match categories in a single aggregate scan of comparison
+        overview_query = """
+            SELECT 
+                COUNT(*) as total_variants,
+                AVG(pos_match) as pos_match_rate,
+                AVG(gt_match) as gt_match_rate,
+                COUNT(CASE WHEN pos_match = 1 AND gt_match = 1 THEN 1 END) as both_match,
+                COUNT(CASE WHEN pos_match = 1 AND gt_match = 0 THEN 1 END) as position_only,
+                COUNT(CASE WHEN pos_match = 0 AND gt_match = 1 THEN 1 END) as genotype_only,
+                COUNT(CASE WHEN pos_match = 0 AND gt_match = 0 THEN 1 END) as both_mismatch
+            FROM comparison
+        """
         
-        gt_match_rate = pd.read_sql_query("""
-            SELECT AVG(gt_match) as rate FROM comparison
-        """, conn).iloc[0]['rate']
+        # Read values column by column so counts keep their integer dtype
+        overview = pd.read_sql_query(overview_query, conn)
+        total_variants = overview['total_variants'].iloc[0]
+        pos_match_rate = overview['pos_match_rate'].iloc[0]
+        gt_match_rate = overview['gt_match_rate'].iloc[0]
         
-        # Calculate proper concordant/discordant variants (non-redundant)
-        both_match_query = """
-            SELECT COUNT(*) as count 
-            FROM comparison 
-            WHERE pos_match = 1 AND gt_match = 1
-        """
-        both_match_result = pd.read_sql_query(both_match_query, conn)
-        concordant_variants = both_match_result.iloc[0]['count']
+        # Concordant = both position and genotype match
+        concordant_variants = overview['both_match'].iloc[0]
 
         # Discordant = any mismatch (position OR genotype OR both) - non-redundant
         discordant_variants = total_variants - concordant_variants
@@ -44,21 +50,11 @@ class SummaryDataCalculator:
         position_match_percentage = round(pos_match_rate * 100, 1) if pos_match_rate else 0
         genotype_match_percentage = round(gt_match_rate * 100, 1) if gt_match_rate else 0
         
-        # Calculate proper match categories
-        match_categories_query = """
-            SELECT 
-                COUNT(CASE WHEN pos_match = 1 AND gt_match = 1 THEN 1 END) as both_match,
-                COUNT(CASE WHEN pos_match = 1 AND gt_match = 0 THEN 1 END) as position_only,
-                COUNT(CASE WHEN pos_match = 0 AND gt_match = 1 THEN 1 END) as genotype_only,
-                COUNT(CASE WHEN pos_match = 0 AND gt_match = 0 THEN 1 END) as both_mismatch
-            FROM comparison
-        """
-        
-        match_stats = pd.read_sql_query(match_categories_query, conn).iloc[0]
-        both_match_count = match_stats['both_match']
-        position_only_count = match_stats['position_only']
-        genotype_only_count = match_stats['genotype_only']
-        both_mismatch_count = match_stats['both_mismatch']
+        # Match categories
+        both_match_count = overview['both_match'].iloc[0]
+        position_only_count = overview['position_only'].iloc[0]
+        genotype_only_count = overview['genotype_only'].iloc[0]
+        both_mismatch_count = overview['both_mismatch'].iloc[0]
         
         # Mapping status breakdown
         mapping_stats = pd.read_sql_query("""
@@ -196,25 +192,53 @@ class SummaryDataCalculator:
             "flip_swap_analysis": flip_swap_cleaned
         }
     
-    def calculate_prioritization_summary(self, df_full, df_excel):
-        """Calculate prioritization summary data (for variant_prioritizer.py)"""
+    def calculate_prioritization_summary(self, df_full, df_excel, priority_counts=None):
+        """
+        Calculate prioritization summary data (for variant_prioritizer.py)
+        
+        priority_counts: optional precomputed {category: count} for df_full
+        """
+        n_full = len(df_full)
         
         # Priority distribution
-        priority_distribution = df_full['priority_category'].value_counts().to_dict() if len(df_full) > 0 else {}
+        if priority_counts is None and n_full > 0:
+            priority_counts = count_categories(df_full['priority_category'])
+        # Most frequent first (ties in category order), as value_counts reported them
+        priority_distribution = {
+            category: count for category, count in sorted(priority_counts.items(), key=lambda item: -item[1])
+            if count > 0
+        } if n_full > 0 else {}
+        
+        # One hg19 x hg38 clinical significance count matrix feeds the transition and coverage sections
+        has_clin_sig = n_full > 0 and 'hg19_clin_sig_normalized' in df_full.columns
+        if has_clin_sig:
+            clin_categories = NORMALIZED_CLINICAL_CATEGORIES
+            clin_matrix = clinical_transition_matrix(df_full['hg19_clin_sig_normalized'],
+                                                     df_full['hg38_clin_sig_normalized'])
+            none_index = clin_categories.index('NONE')
         
         # Clinical transitions analysis
         clinical_transitions = {}
-        if len(df_full) > 0 and 'hg19_clin_sig_normalized' in df_full.columns:
-            # Stable annotations
-            stable_variants = df_full[df_full['hg19_clin_sig_normalized'] == df_full['hg38_clin_sig_normalized']]
-            stable_counts = stable_variants['hg19_clin_sig_normalized'].value_counts().to_dict()
+        if has_clin_sig:
+            # Stable annotations (matrix diagonal, most frequent first)
+            stable_diagonal = np.diag(clin_matrix)
+            stable_counts = {
+                clin_categories[i]: int(stable_diagonal[i])
+                for i in np.argsort(-stable_diagonal, kind='stable') if stable_diagonal[i] > 0
+            }
+            total_stable = int(stable_diagonal.sum())
             
             # Directional changes
-            changing_variants = df_full[df_full['hg19_clin_sig_normalized'] != df_full['hg38_clin_sig_normalized']]
+            total_changing = n_full - total_stable
             directional_changes_list = [] 
             
-            if len(changing_variants) > 0:
-                transition_counts = changing_variants.groupby(['hg19_clin_sig_normalized', 'hg38_clin_sig_normalized']).size()
+            if total_changing > 0:
+                # Observed off-diagonal cells, keyed (hg19, hg38)
+                transition_counts = {
+                    (hg19_cat, hg38_cat): int(clin_matrix[i, j])
+                    for i, hg19_cat in enumerate(clin_categories) for j, hg38_cat in enumerate(clin_categories)
+                    if i != j and clin_matrix[i, j] > 0
+                }
                 
                 # Calculate clinical priority for each transition
                 def get_clinical_priority(hg19_cat, hg38_cat):
@@ -258,7 +282,7 @@ class SummaryDataCalculator:
                 
                 # Create ordered list of directional changes
                 directional_changes_list = []
-                for (hg19_cat, hg38_cat), count in transition_counts.items():
+                for (hg19_cat, hg38_cat), count in sorted(transition_counts.items()):
                     clinical_priority = get_clinical_priority(hg19_cat, hg38_cat)
                     directional_changes_list.append({
                         "transition": f"{hg19_cat}→{hg38_cat}",
@@ -286,34 +310,51 @@ class SummaryDataCalculator:
                 "stable_annotations": stable_counts,
                 "directional_changes": directional_changes,
                 "directional_changes_ordered": directional_changes_list,  # For ordered display
-                "total_stable": len(stable_variants),
-                "total_changing": len(changing_variants)
+                "total_stable": total_stable,
+                "total_changing": total_changing
             }
         
         # Impact transitions
         impact_transitions = {}
-        if len(df_full) > 0:
-            stable_impact = df_full[df_full['hg19_impact'] == df_full['hg38_impact']]
-            changing_impact = df_full[df_full['hg19_impact'] != df_full['hg38_impact']]
+        if n_full > 0:
+            # One contingency table over sorted impact labels (missing impacts factorize to -1)
+            impact_codes, impact_labels = pd.factorize(
+                np.concatenate([df_full['hg19_impact'].to_numpy(dtype=object),
+                                df_full['hg38_impact'].to_numpy(dtype=object)]),
+                sort=True
+            )
+            hg19_codes, hg38_codes = impact_codes[:n_full], impact_codes[n_full:]
+            both_present = (hg19_codes >= 0) & (hg38_codes >= 0)
+            stable_mask = both_present & (hg19_codes == hg38_codes)
+            stable_impact_count = int(np.count_nonzero(stable_mask))
             
-            if len(changing_impact) > 0:
-                impact_transition_counts = changing_impact.groupby(['hg19_impact', 'hg38_impact']).size()
-                impact_changes = {f"{hg19}→{hg38}": count for (hg19, hg38), count in impact_transition_counts.items()}
-            else:
-                impact_changes = {}
+            changing = both_present & ~stable_mask
+            n_labels = len(impact_labels)
+            impact_matrix = np.bincount(hg19_codes[changing] * n_labels + hg38_codes[changing],
+                                        minlength=n_labels * n_labels).reshape(n_labels, n_labels)
+            # Row-major over sorted labels, matching groupby(['hg19_impact', 'hg38_impact']) key order
+            impact_changes = {
+                f"{impact_labels[i]}→{impact_labels[j]}": int(impact_matrix[i, j])
+                for i, j in zip(*np.nonzero(impact_matrix))
+            }
             
             impact_transitions = {
-                "stable_count": len(stable_impact),
-                "stable_percentage": len(stable_impact) / len(df_full) * 100,
+                "stable_count": stable_impact_count,
+                "stable_percentage": stable_impact_count / n_full * 100,
                 "transitions": impact_changes
             }
         
         # Clinical coverage analysis 
         clinical_coverage = {}
-        if len(df_full) > 0 and 'hg19_clin_sig_normalized' in df_full.columns:
-            # Build-specific counts with ordered categories
-            hg19_counts = df_full['hg19_clin_sig_normalized'].value_counts().to_dict()
-            hg38_counts = df_full['hg38_clin_sig_normalized'].value_counts().to_dict()
+        if has_clin_sig:
+            # Build-specific counts with ordered categories (matrix row / column sums)
+            hg19_totals = clin_matrix.sum(axis=1)
+            hg38_totals = clin_matrix.sum(axis=0)
+            # Most frequent first (ties in category order), as value_counts reported them
+            hg19_counts = {clin_categories[i]: int(hg19_totals[i])
+                           for i in np.argsort(-hg19_totals, kind='stable') if hg19_totals[i] > 0}
+            hg38_counts = {clin_categories[i]: int(hg38_totals[i])
+                           for i in np.argsort(-hg38_totals, kind='stable') if hg38_totals[i] > 0}
             
             # Order categories by clinical interest
             category_order = ['PATHOGENIC', 'BENIGN', 'VUS', 'RISK', 'DRUG_RESPONSE', 'PROTECTIVE', 'OTHER', 'NONE']
@@ -342,30 +383,25 @@ class SummaryDataCalculator:
             }
             
             # Overall coverage
-            has_hg19_clin = (df_full['hg19_clin_sig_normalized'] != 'NONE').sum()
-            has_hg38_clin = (df_full['hg38_clin_sig_normalized'] != 'NONE').sum()
-            has_any_clin = ((df_full['hg19_clin_sig_normalized'] != 'NONE') | 
-                           (df_full['hg38_clin_sig_normalized'] != 'NONE')).sum()
+            has_hg19_clin = n_full - hg19_totals[none_index]
+            has_hg38_clin = n_full - hg38_totals[none_index]
+            has_any_clin = n_full - clin_matrix[none_index, none_index]
             
             # Pathogenicity predictions - properly exclude missing values including "-"
-            has_sift_hg19 = (df_full['hg19_sift'] != 'NONE') & (df_full['hg19_sift'] != '-') & (df_full['hg19_sift'].notna())
-            has_sift_hg38 = (df_full['hg38_sift'] != 'NONE') & (df_full['hg38_sift'] != '-') & (df_full['hg38_sift'].notna())
-            has_polyphen_hg19 = (df_full['hg19_polyphen'] != 'NONE') & (df_full['hg19_polyphen'] != '-') & (df_full['hg19_polyphen'].notna())
-            has_polyphen_hg38 = (df_full['hg38_polyphen'] != 'NONE') & (df_full['hg38_polyphen'] != '-') & (df_full['hg38_polyphen'].notna())
-            
-            has_sift_any = has_sift_hg19 | has_sift_hg38
-            has_polyphen_any = has_polyphen_hg19 | has_polyphen_hg38
-            has_predictions = has_sift_any | has_polyphen_any
+            # One (variants x 4) presence matrix: SIFT hg19/hg38, PolyPhen hg19/hg38
+            predictions = df_full[['hg19_sift', 'hg38_sift', 'hg19_polyphen', 'hg38_polyphen']]
+            has_prediction = predictions.notna().to_numpy(dtype=bool) & ~predictions.isin(['NONE', '-']).to_numpy(dtype=bool)
             
-            sift_coverage = has_sift_any.sum()
-            polyphen_coverage = has_polyphen_any.sum()
-            pred_count = has_predictions.sum()
+            # numpy bool sums keep numpy int counts whether or not the columns are Arrow-backed
+            sift_coverage = has_prediction[:, :2].any(axis=1).sum()
+            polyphen_coverage = has_prediction[:, 2:].any(axis=1).sum()
+            pred_count = has_prediction.any(axis=1).sum()
             
             clinical_coverage = {
-                "total_variants": len(df_full),
+                "total_variants": n_full,
                 "clinical_annotations": {
                     "total_with_annotations": has_any_clin,
-                    "percentage_with_annotations": round(has_any_clin / len(df_full) * 100, 1),
+                    "percentage_with_annotations": round(has_any_clin / n_full * 100, 1),
                     "hg19_with_annotations": has_hg19_clin,
                     "hg38_with_annotations": has_hg38_clin,
                     "build_comparison": build_comparison,
@@ -375,36 +411,31 @@ class SummaryDataCalculator:
                 },
                 "pathogenicity_predictions": {
                     "with_predictions": pred_count,
-                    "percentage_with_predictions": round(pred_count / len(df_full) * 100, 1),
+                    "percentage_with_predictions": round(pred_count / n_full * 100, 1),
                     "sift_coverage": sift_coverage,
                     "polyphen_coverage": polyphen_coverage,
-                    "sift_percentage": round(sift_coverage / len(df_full) * 100, 1),
-                    "polyphen_percentage": round(polyphen_coverage / len(df_full) * 100, 1)
+                    "sift_percentage": round(sift_coverage / n_full * 100, 1),
+                    "polyphen_percentage": round(polyphen_coverage / n_full * 100, 1)
                 }
             }
 
         # Priority transcript HGVS analysis  
         hgvs_analysis = {}
-        if len(df_full) > 0 and 'priority_hgvsc_concordance' in df_full.columns:
-            total_variants = len(df_full)
+        if n_full > 0 and 'priority_hgvsc_concordance' in df_full.columns:
+            total_variants = n_full
             
-            # HGVSc concordance rates
-            hgvsc_match = (df_full['priority_hgvsc_concordance'] == 'Match').sum()
-            hgvsc_mismatch = (df_full['priority_hgvsc_concordance'] == 'Mismatch').sum()
-            hgvsc_no_analysis = (df_full['priority_hgvsc_concordance'] == 'No_Analysis').sum()
-            
-            # HGVSp concordance rates  
-            hgvsp_match = (df_full['priority_hgvsp_concordance'] == 'Match').sum()
-            hgvsp_mismatch = (df_full['priority_hgvsp_concordance'] == 'Mismatch').sum()
-            hgvsp_no_analysis = (df_full['priority_hgvsp_concordance'] == 'No_Analysis').sum()
+            # One value_counts pass per column instead of one equality scan per reported value
+            # (reindex keeps absent values at 0 and the counts as numpy ints)
+            hgvsc_match, hgvsc_mismatch, hgvsc_no_analysis = df_full['priority_hgvsc_concordance'].value_counts().reindex(
+                ['Match', 'Mismatch', 'No_Analysis'], fill_value=0).to_numpy()
+            hgvsp_match, hgvsp_mismatch, hgvsp_no_analysis = df_full['priority_hgvsp_concordance'].value_counts().reindex(
+                ['Match', 'Mismatch', 'No_Analysis'], fill_value=0).to_numpy()
             
             # MANE transcript availability
-            mane_select_both = (df_full['transcript_crossbuild_status'] == 'MANE_Select_Both_Builds').sum()
-            mane_plus_clinical_both = (df_full['transcript_crossbuild_status'] == 'MANE_Plus_Clinical_Both_Builds').sum()
-            mane_hg38_only = (df_full['transcript_crossbuild_status'] == 'MANE_hg38_Only').sum()
-            canonical_fallback_both = (df_full['transcript_crossbuild_status'] == 'Canonical_Fallback_Both_Builds').sum()
-            no_matching_transcripts = (df_full['transcript_crossbuild_status'] == 'No_Matching_Transcripts').sum()
-            no_transcripts = (df_full['transcript_crossbuild_status'] == 'No_Transcripts').sum()
+            (mane_select_both, mane_plus_clinical_both, mane_hg38_only, canonical_fallback_both,
+             no_matching_transcripts, no_transcripts) = df_full['transcript_crossbuild_status'].value_counts().reindex(
+                ['MANE_Select_Both_Builds', 'MANE_Plus_Clinical_Both_Builds', 'MANE_hg38_Only',
+                 'Canonical_Fallback_Both_Builds', 'No_Matching_Transcripts', 'No_Transcripts'], fill_value=0).to_numpy()
             
             hgvs_analysis = {
                 'priority_transcript_analysis': {
@@ -429,19 +460,33 @@ class SummaryDataCalculator:
                 'status': 'columns_not_available_in_dataframe'
             }
 
+        # int8 change flags from the scoring pipeline, shared by the discordance and top-variant counts
+        no_change = np.zeros(n_full, dtype=np.int8)
+        clin_sig_change = df_full['clin_sig_change'].to_numpy() if 'clin_sig_change' in df_full.columns else None
+        has_clin_change = df_full['has_clin_change'].to_numpy() if 'has_clin_change' in df_full.columns else no_change
+        has_prediction_change = no_change
+        if 'has_sift_change' in df_full.columns:
+            # Single fused OR into a preallocated buffer (no intermediate Series)
+            has_prediction_change = np.empty(n_full, dtype=np.int8)
+            np.bitwise_or(df_full['has_sift_change'].to_numpy(), df_full['has_polyphen_change'].to_numpy(),
+                          out=has_prediction_change)
+
         # Functional discordances
         functional_discordances = {}
-        if len(df_full) > 0:
+        if n_full > 0:
+            gene_changes, impact_changes = np.count_nonzero(
+                df_full[['gene_changes', 'impact_changes']].to_numpy() > 0, axis=0
+            )
             functional_discordances = {
-                "gene_changes": (df_full['gene_changes'] > 0).sum(),
-                "impact_changes": (df_full['impact_changes'] > 0).sum(),
-                "clinical_significance_changes": (df_full['clin_sig_change'] != '').sum() if 'clin_sig_change' in df_full.columns else 0,
-                "pathogenicity_changes": ((df_full['sift_change'] != '') | (df_full['polyphen_change'] != '')).sum() if 'sift_change' in df_full.columns else 0
+                "gene_changes": gene_changes,
+                "impact_changes": impact_changes,
+                "clinical_significance_changes": np.count_nonzero(has_clin_change),
+                "pathogenicity_changes": np.count_nonzero(has_prediction_change)
             }
         
         # Per-gene technical discrepancy analysis
         gene_technical_analysis = {}
-        if len(df_full) > 0:
+        if n_full > 0:
             # Count technical issues per gene
             gene_stats = {}
             for _, row in df_full.iterrows():
@@ -513,22 +558,23 @@ class SummaryDataCalculator:
         top_variants_summary = {}
         if len(df_excel) > 0:
             # Count DISTINCT variants with critical issues
-            critical_variants_mask = (
-                (df_full['clin_sig_change'].isin(['BENIGN_TO_PATHOGENIC', 'PATHOGENIC_TO_BENIGN', 'VUS_TO_PATHOGENIC']))
-            )
-            critical_variants_count = critical_variants_mask.sum()
+            critical_variants_count = np.count_nonzero(
+                np.isin(clin_sig_change, ['BENIGN_TO_PATHOGENIC', 'PATHOGENIC_TO_BENIGN', 'VUS_TO_PATHOGENIC'])
+            ) if clin_sig_change is not None else 0
             
-            # Count clinical significance changes
-            clinical_changes = (df_full['clin_sig_change'] != '').sum() if 'clin_sig_change' in df_full.columns else 0
+            # Priority categories counted with one bincount over the categorical codes
+            # rather than one filtered copy per category
+            has_category = 'Priority_Category' in df_excel.columns
+            excel_priority_counts = count_categories(df_excel['Priority_Category']) if has_category else {}
             
             top_variants_summary = {
                 "total_in_excel": len(df_excel),
-                "critical_count": len(df_excel[df_excel['Priority_Category'] == 'CRITICAL']) if 'Priority_Category' in df_excel.columns else 0,
-                "high_count": len(df_excel[df_excel['Priority_Category'] == 'HIGH']) if 'Priority_Category' in df_excel.columns else 0,
-                "moderate_count": len(df_excel[df_excel['Priority_Category'] == 'MODERATE']) if 'Priority_Category' in df_excel.columns else 0,
+                "critical_count": excel_priority_counts.get('CRITICAL', 0),
+                "high_count": excel_priority_counts.get('HIGH', 0),
+                "moderate_count": excel_priority_counts.get('MODERATE', 0),
                 "avg_priority_score": round(df_excel['Priority_Score'].mean(), 1) if 'Priority_Score' in df_excel.columns else 0,
                 "max_priority_score": round(df_excel['Priority_Score'].max(), 1) if 'Priority_Score' in df_excel.columns else 0,
-                "clinical_changes_count": len(df_excel[df_excel['Has_Clinical_Change'] == 'YES']) if 'Has_Clinical_Change' in df_excel.columns else 0,
+                "clinical_changes_count": int(np.count_nonzero(df_excel['Has_Clinical_Change'].to_numpy() == 'YES')) if 'Has_Clinical_Change' in df_excel.columns else 0,
                 "critical_variants_distinct": critical_variants_count
             }
         
@@ -536,11 +582,11 @@ class SummaryDataCalculator:
             "metadata": {
                 "script": "variant_prioritizer",
                 "timestamp": datetime.now().isoformat(),
-                "total_analyzed": len(df_full),
+                "total_analyzed": n_full,
                 "total_output": len(df_excel)
             },
             "dataset_overview": {
-                "total_discordant_variants": len(df_full),
+                "total_discordant_variants": n_full,
                 "variants_in_excel_output": len(df_excel)
             },
             "priority_distribution": priority_distribution,
@@ -5,6 +5,8 @@ Functions for processing transcript IDs, genotype extraction, and other
 transcript-related data transformations.
 """
 
+from functools import lru_cache
+
 import pandas as pd
 
 
@@ -27,14 +29,40 @@ def extract_genotype_from_alleles(source_alleles):
         return parts[0].strip(), ''
 
 
+CONSEQUENCE_RELATIONSHIPS = (
+    'matched', 'disjoint_consequences', 'partial_overlap_consequences',
+    'hg19_subset_of_hg38', 'hg38_subset_of_hg19'
+)
+
+
 def format_consequence_relationship(relationship, hg19_consequences, hg38_consequences):
     """Format consequence relationship with unified display format"""
     if not hg19_consequences and not hg38_consequences:
         return f"{relationship}: no consequence data"
+    if relationship not in CONSEQUENCE_RELATIONSHIPS:
+        return f"{relationship}: {hg19_consequences} vs {hg38_consequences}"
     
     # Parse consequence sets
-    hg19_set = set(c.strip() for c in hg19_consequences.split(',') if c.strip()) if hg19_consequences else set()
-    hg38_set = set(c.strip() for c in hg38_consequences.split(',') if c.strip()) if hg38_consequences else set()
+    hg19_set = frozenset(c.strip() for c in hg19_consequences.split(',') if c.strip()) if hg19_consequences else frozenset()
+    hg38_set = frozenset(c.strip() for c in hg38_consequences.split(',') if c.strip()) if hg38_consequences else frozenset()
+    
+    return format_consequence_sets(relationship, hg19_set, hg38_set)
+
+
+# Distinct (relationship, hg19 set, hg38 set) inputs come from the bounded VEP consequence
+# vocabulary, so formatted results are memoized per process
+CONSEQUENCE_FORMAT_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=CONSEQUENCE_FORMAT_CACHE_SIZE)
+def format_consequence_sets(relationship, hg19_set, hg38_set):
+    """
+    Format consequence relationship from already-parsed consequence frozensets (memoized)
+
+    Only the relationships in CONSEQUENCE_RELATIONSHIPS (or empty sets) are accepted.
+    """
+    if not hg19_set and not hg38_set:
+        return f"{relationship}: no consequence data"
     
     if relationship == 'matched':
         return ', '.join(sorted(hg19_set))
@@ -69,7 +97,9 @@ def format_consequence_relationship(relationship, hg19_consequences, hg38_conseq
         left_side = ' '.join(parts)
         return f"{left_side} →"
     else:
-        return f"{relationship}: {hg19_consequences} vs {hg38_consequences}"
+        # Unknown relationships print the raw consequence strings, which the parsed sets no longer
+        # hold; format those through format_consequence_relationship
+        raise ValueError(f"Unknown consequence relationship: {relationship}")
 
 def analyze_consequence_relationships(hg19_transcripts, hg38_transcripts):
     """
@@ -127,10 +157,9 @@ def analyze_consequence_relationships(hg19_transcripts, hg38_transcripts):
     else:  # Partial overlap
         consequence_relationship = 'partial_overlap_consequences'
 
-    # Format consequence change directly
-    hg19_str = ', '.join(sorted(all_hg19_consequences)) if all_hg19_consequences else ''
-    hg38_str = ', '.join(sorted(all_hg38_consequences)) if all_hg38_consequences else ''
-    consequence_change = format_consequence_relationship(consequence_relationship, hg19_str, hg38_str)
+    # Format consequence change straight from the sets (no join/re-split round trip)
+    consequence_change = format_consequence_sets(consequence_relationship, frozenset(all_hg19_consequences),
+                                                 frozenset(all_hg38_consequences))
 
     return consequence_relationship, consequence_change
 
@@ -36,13 +36,13 @@ CACHING:
     • First run: Always calculates (no cache exists yet)
     • Subsequent runs: Uses cache for faster analysis
     • Use --force flag to recalculate and update cache
-    • Cache stores raw VEP analysis only (scores calculated on-the-fly)
+    • Cache stores raw VEP analysis; scores are reused only while the scoring is unchanged
 """
 
-import sqlite3
+import multiprocessing
+from contextlib import closing
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import argparse
 from pathlib import Path
 import numpy as np
@@ -50,7 +50,7 @@ import sys
 import re
 
 # Import configuration
-from config.constants import VEP_CONSEQUENCE_IMPACT
+from config.constants import VEP_CONSEQUENCE_IMPACT, IMPACT_NUMERIC_VALUES, NORMALIZED_CLINICAL_CATEGORIES
 from config.scoring_config import (
     CLINICAL_OVERRIDE,           # Keep: still used for benign/pathogenic handling
     BASE_SCORES,                 # Keep: updated with new scoring
@@ -68,19 +68,30 @@ from utils.clinical_utils import (
     is_pathogenic_clinical_significance,
     is_benign_clinical_significance,
     parse_sift_prediction,
-    parse_polyphen_prediction
+    parse_polyphen_prediction,
+    clinical_transition_matrix
 )
 from utils.transcript_utils import (
     extract_genotype_from_alleles
 )
 from utils.impact_utils import (
     get_impact_numeric_value,
+    decode_impact_level,
+    encode_impact_levels,
     calculate_impact_transition_magnitude
 )
-from utils.data_utils import safe_int_convert
-
-# Import visualization
-from visualization.plot_generator import PrioritizationPlotter
+from utils.data_utils import (
+    select_top_rows,
+    count_categories,
+    yes_no_flags,
+    fill_missing_blank,
+    write_csv,
+    write_xlsx,
+    connect_read_only,
+    find_missing_tables,
+    PYARROW_AVAILABLE,
+    XLSXWRITER_AVAILABLE
+)
 
 # Import analysis engine
 from analysis.variant_processor import VariantProcessor
@@ -88,34 +99,38 @@ from analysis.variant_processor import VariantProcessor
 from utils.summary_utils import SummaryDataCalculator
 import json
 
-# Set visualization style from config
-plt.style.use(PLOT_STYLE_CONFIG['style'])
-sns.set_palette(PLOT_STYLE_CONFIG['seaborn_palette'])
+# Columns the prioritization plots read (all the plot process receives)
+PLOT_SOURCE_COLUMNS = [
+    'hg19_clin_sig_normalized', 'hg38_clin_sig_normalized',
+    'hg19_impact', 'hg38_impact',
+    'priority_hgvsc_concordance', 'priority_hgvsp_concordance',
+    'score_breakdown'
+]
+
+# Fixed header of the end-of-run console summary
+COMPLETION_SUMMARY_TEMPLATE = (
+    "\n" + "=" * 80 + "\n"
+    "PRIORITIZATION COMPLETED SUCCESSFULLY\n" +
+    "=" * 80 + "\n"
+    "📁 Output directory: {output_dir}\n"
+    "📊 Total variants analyzed: {total_analyzed:,}\n"
+    "📋 Variants in CSV output: {total_output:,}"
+)
 
 def connect_database(db_path):
     """Connect to SQLite database and verify structure"""
     if not Path(db_path).exists():
         raise FileNotFoundError(f"Database not found: {db_path}")
     
-    conn = sqlite3.connect(db_path)
+    conn = connect_read_only(db_path)
     
     # Verify required tables
-    cursor = conn.cursor()
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-    tables = [row[0] for row in cursor.fetchall()]
-    
-    required_tables = ['comparison', 'hg19_vep', 'hg38_vep']
-    missing_tables = [t for t in required_tables if t not in tables]
+    missing_tables = find_missing_tables(conn, ['comparison', 'hg19_vep', 'hg38_vep'])
     if missing_tables:
         raise ValueError(f"Missing required database tables: {missing_tables}")
     
     return conn
 
-def get_impact_numeric_value(impact):
-    """Convert impact to numeric value for magnitude calculation"""
-    impact_values = {'HIGH': 4, 'MODERATE': 3, 'LOW': 2, 'MODIFIER': 1}
-    return impact_values.get(impact, 0)
-
 def format_allele_for_display(allele_string, max_length=10):
     """
     Format allele strings for display, truncating long sequences
@@ -157,534 +172,565 @@ def format_allele_for_display(allele_string, max_length=10):
     
     return f"{ref_display}/{alt_display}"
 
-def format_for_excel(df):
-    """Format dataframe for Excel compatibility with enhanced clinical details and proper genotype extraction"""
-    print("Formatting data for Excel...")
-    
-    # Debug: show what we're working with
-    print(f"Input dataframe has {len(df)} rows")
-    if len(df) > 0:
-        print("First row of data:")
-        print(df.iloc[0].to_dict())
-    
-    # Reset the index so we have 0-based indexing
-    df = df.reset_index(drop=True)
-    
-    # Create a clean output dataframe
-    output_df = pd.DataFrame()
-    
-    # Basic variant information
-    output_df['Rank'] = range(1, len(df) + 1)
-    output_df['Priority_Score'] = df['priority_score']
-    output_df['Priority_Category'] = df['priority_category']
-    output_df['Chromosome_hg19'] = df['source_chrom']
-    output_df['Chromosome_hg38'] = df['bcftools_hg38_chrom']
-    output_df['Position_hg19'] = df['source_pos']
-    
-   # GT creation using direct data sources
-    output_df['GT_hg19'] = df['source_alleles'].fillna('')
-    output_df['GT_hg38'] = df['GT_hg38'].fillna('')  # Use the already created column
-
-    output_df['Mapping_Status'] = df['mapping_status']
-    
-    output_df['Position_hg38_CrossMap'] = safe_int_convert(df['liftover_hg38_pos'])
-    output_df['Position_hg38_bcftools'] = safe_int_convert(df['bcftools_hg38_pos'])
-    output_df['Position_Match'] = df['pos_match'].map({1: 'YES', 0: 'NO'})
-    output_df['Position_Difference'] = safe_int_convert(df['pos_difference'])
-    
-    # Genotype information
-    output_df['Genotype_Match'] = df['gt_match'].map({1: 'YES', 0: 'NO'})
-    output_df['Strand_Flip'] = df['flip'].fillna('')
-    output_df['Ref_Alt_Swap'] = df['swap'].fillna('')
-    
-    # Enhanced transcript analysis with problematic transcript lists
-    output_df['Gene_Annotation_Changes'] = df['gene_changes']
-    output_df['Impact_Level_Changes'] = df['impact_changes']
-    output_df['Discordance_Summary'] = df['score_breakdown']
-    
-    # Gene information
-    output_df['Gene_hg19'] = df['hg19_gene'].fillna('')
-    output_df['Gene_hg38'] = df['hg38_gene'].fillna('')
-    output_df['Gene_Match'] = (df['hg19_gene'] == df['hg38_gene']).map({True: 'YES', False: 'NO'})
-    
-    # VEP consequences (representative - from first transcript if available)
-       
-    # Impact
-    output_df['Impact_hg19'] = df['hg19_impact'].fillna('')
-    output_df['Impact_hg38'] = df['hg38_impact'].fillna('')
-    output_df['Impact_Match'] = (df['hg19_impact'] == df['hg38_impact']).map({True: 'YES', False: 'NO'})
-    
-    # Enhanced clinical significance tracking (original + normalized)
-    output_df['Clinical_Significance_hg19'] = df['hg19_clin_sig'].fillna('')
-    output_df['Clinical_Significance_hg38'] = df['hg38_clin_sig'].fillna('')
-    output_df['Clinical_Significance_hg19_Normalized'] = df['hg19_clin_sig_normalized'].fillna('')
-    output_df['Clinical_Significance_hg38_Normalized'] = df['hg38_clin_sig_normalized'].fillna('')
-    output_df['Clinical_Significance_Change'] = df['clin_sig_change'].fillna('')
-    
-    # Population frequencies
-    output_df['gnomAD_Frequency_hg19'] = df['hg19_gnomad_af'].fillna('')
-    output_df['gnomAD_Frequency_hg38'] = df['hg38_gnomad_af'].fillna('')
-    
-    # Enhanced pathogenicity predictions with change tracking
-    output_df['SIFT_hg19'] = df['hg19_sift'].fillna('')
-    output_df['SIFT_hg38'] = df['hg38_sift'].fillna('')
-    output_df['SIFT_Change'] = df['sift_change'].fillna('')
-    output_df['PolyPhen_hg19'] = df['hg19_polyphen'].fillna('')
-    output_df['PolyPhen_hg38'] = df['hg38_polyphen'].fillna('')
-    output_df['PolyPhen_Change'] = df['polyphen_change'].fillna('')
-
-    # Transcript counts
-    output_df['Tx_Count_hg19'] = df['hg19_transcript_count'].fillna(0)
-    output_df['Tx_Count_hg38'] = df['hg38_transcript_count'].fillna(0)
+def format_alleles_for_display(alleles, max_length=10):
+    """
+    Vectorized format_allele_for_display over a Series of allele strings
+    
+    Args:
+        alleles: Series of allele strings like "LONG_REF/ALT" (missing values give '')
+        max_length: Maximum length before truncating (default: 10)
+        
+    Returns:
+        np.ndarray: Formatted allele strings (object dtype)
+    """
+    alleles = alleles.fillna('').astype(str)
+    if len(alleles) == 0:
+        return np.array([], dtype=object)
+    slash_count = alleles.str.count('/').to_numpy()
+    ref, _, alt = (alleles.str.partition('/')[i] for i in range(3))
+    
+    ref_length = ref.str.len()
+    alt_length = alt.str.len()
+    ref_display = ref.where(ref_length <= max_length, 'REFSEQ len=' + ref_length.astype(str))
+    alt_display = alt.where(alt_length <= max_length, 'ALTSEQ len=' + alt_length.astype(str))
+    
+    return np.select(
+        [(alleles == '').to_numpy(), slash_count == 0, slash_count > 1],
+        [alleles.to_numpy(), ref_display.to_numpy(), alleles.to_numpy()],  # '', single allele, unexpected format
+        default=(ref_display + '/' + alt_display).to_numpy()
+    ).astype(object)
+
+
+# Low-cardinality output columns stored as dictionary-encoded categoricals in Parquet
+PARQUET_CATEGORICAL_COLUMNS = [
+    'Chromosome_hg19', 'Chromosome_hg38', 'Mapping_Status', 'Priority_Category',
+    'Consequence_hg19', 'Consequence_hg38', 'Worst_Consequence_hg19', 'Worst_Consequence_hg38',
+    'Transcript_CrossBuild_Status', 'HGVS_c_Concordance', 'HGVS_p_Concordance'
+]
+
+
+# Low-cardinality CSV/Excel output columns (flags and status labels) stored as categoricals
+CLINICAL_CSV_CATEGORICAL_COLUMNS = [
+    'Strand_Flip', 'Ref_Alt_Swap', 'MANE_Flag_hg38', 'Transcript_CrossBuild_Status',
+    'HGVS_c_Concordance', 'HGVS_p_Concordance', 'Has_Worst_Consequence_Difference',
+    'Worst_Consequence_Tx_Is_Priority_hg19', 'Worst_Consequence_Tx_Is_Priority_hg38',
+    'Consequence_Relationship', 'Mapping_Status', 'Priority_Category',
+    'Has_Clinical_Change', 'Has_Impact_Change', 'Has_Consequence_Change'
+]
+
+# Small-range integer output columns downcast to the narrowest integer dtype
+CLINICAL_CSV_INTEGER_COLUMNS = ['Tx_Count_hg19', 'Tx_Count_hg38', 'Position_Match', 'Genotype_Match']
+
+
+def categorize_output_columns(final_df):
+    """
+    Store the low-cardinality output columns as categoricals (codes plus a few labels)
 
-    # MANE information
-    output_df['MANE_Flag_hg38'] = df['hg38_mane_flag'].fillna('None')
-    output_df['MANE_Transcript_ID_hg38'] = df['hg38_mane_transcript_id'].fillna('')
-    output_df['MANE_Details_hg38'] = df['hg38_mane_details'].fillna('')
-    output_df['MANE_Transcript_ID_hg19'] = df['hg19_mane_transcript_id'].fillna('')
-    output_df['MANE_Details_hg19'] = df['hg19_mane_details'].fillna('')
+    Must run after fill_missing_blank: a categorical cannot take a fill value outside its categories.
+    """
+    for col in CLINICAL_CSV_CATEGORICAL_COLUMNS:
+        if col in final_df.columns:
+            final_df[col] = final_df[col].astype('category')
+    return final_df
 
-    # Canonical transcript info (build-specific)
-    output_df['CANONICAL_transcript_hg19'] = df['hg19_canonical_transcript'].fillna('')
-    output_df['CANONICAL_transcript_hg38'] = df['hg38_canonical_transcript'].fillna('')
 
+# Clinical evidence-focused output columns: source column -> output column name
+CLINICAL_CSV_COLUMNS = {
+    'Rank': 'Rank',
+    'source_chrom': 'Chromosome_hg19',
+    'bcftools_hg38_chrom': 'Chromosome_hg38',
+    'source_pos': 'Position_hg19',
+    'bcftools_hg38_pos': 'Position_hg38_bcftools',
+    'liftover_hg38_pos': 'Position_hg38_CrossMap',
+    'GT_hg19': 'GT_hg19',
+    'GT_hg38': 'GT_hg38', 
+    'flip': 'Strand_Flip',      
+    'swap': 'Ref_Alt_Swap', 
+    'hg19_gene': 'Gene_hg19',
+    'hg38_gene': 'Gene_hg38',
+    'gene_changes': 'Gene_Changes',
+    'score_breakdown': 'Discordance_Summary',
+    'hg19_clin_sig_normalized': 'Clinical_Significance_hg19',
+    'hg38_clin_sig_normalized': 'Clinical_Significance_hg38',
+    'clin_sig_change': 'Clinical_Change_Direction',
+#        'hg19_impact': 'Impact_hg19',
+#        'hg38_impact': 'Impact_hg38',
+    'hg19_transcript_count': 'Tx_Count_hg19',
+    'hg38_transcript_count': 'Tx_Count_hg38',
+    # MANE information
+    'hg38_mane_flag': 'MANE_Flag_hg38',
+    'hg38_mane_transcript_id': 'MANE_Transcript_ID_hg38',
+    'hg38_mane_details': 'MANE_Details_hg38',
+    'hg19_mane_transcript_id': 'MANE_Transcript_ID_hg19',
+    'hg19_mane_details': 'MANE_Details_hg19',
+    # Canonical transcripts
+    'hg19_canonical_transcript': 'CANONICAL_transcript_hg19',
+    'hg38_canonical_transcript': 'CANONICAL_transcript_hg38',
     # Priority transcript selection
-    output_df['Transcript_CrossBuild_Status'] = df['transcript_crossbuild_status'].fillna('No_Transcripts')
-    output_df['Priority_Transcript_CrossBuild'] = df['priority_transcript_crossbuild'].fillna('NONE')
-    output_df['Consequence_hg19'] = df['priority_consequence_hg19'].fillna('')
-    output_df['Consequence_hg38'] = df['priority_consequence_hg38'].fillna('')
+    'transcript_crossbuild_status': 'Transcript_CrossBuild_Status',
+    'priority_transcript_crossbuild': 'Priority_Transcript_CrossBuild',
 
     # Priority transcript HGVS analysis
-    output_df['HGVS_c_hg19'] = df['priority_hgvsc_hg19'].fillna('')
-    output_df['HGVS_c_hg38'] = df['priority_hgvsc_hg38'].fillna('')
-    output_df['HGVS_p_hg19'] = df['priority_hgvsp_hg19'].fillna('')
-    output_df['HGVS_p_hg38'] = df['priority_hgvsp_hg38'].fillna('')
-    output_df['HGVS_c_Concordance'] = df['priority_hgvsc_concordance'].fillna('No_Analysis')
-    output_df['HGVS_p_Concordance'] = df['priority_hgvsp_concordance'].fillna('No_Analysis')
-
+    'priority_hgvsc_hg19': 'HGVS_c_hg19',
+    'priority_hgvsc_hg38': 'HGVS_c_hg38',
+    'priority_hgvsp_hg19': 'HGVS_p_hg19',
+    'priority_hgvsp_hg38': 'HGVS_p_hg38',
+    'priority_hgvsc_concordance': 'HGVS_c_Concordance',
+    'priority_hgvsp_concordance': 'HGVS_p_Concordance',
+    # Matched transcript analysis
+    'has_worst_consequence_difference': 'Has_Worst_Consequence_Difference',
+    'hg19_worst_consequence_tx_is_priority': 'Worst_Consequence_Tx_Is_Priority_hg19',
+    'hg38_worst_consequence_tx_is_priority': 'Worst_Consequence_Tx_Is_Priority_hg38',
+    'priority_consequence_hg19': 'Consequence_hg19',
+    'priority_consequence_hg38': 'Consequence_hg38',
+    'consequence_relationship': 'Consequence_Relationship',
+    'consequence_change': 'Consequence_Change',
     # Worst consequence analysis
-    output_df['Worst_Consequence_hg19'] = df['hg19_worst_consequence'].fillna('')
-    output_df['Worst_Consequence_hg38'] = df['hg38_worst_consequence'].fillna('')
-    output_df['Worst_Consequence_Tx_Is_Priority_hg19'] = df['hg19_worst_consequence_tx_is_priority'].fillna('NO')
-    output_df['Worst_Consequence_Tx_Is_Priority_hg38'] = df['hg38_worst_consequence_tx_is_priority'].fillna('NO')
-  
-    # Summary flags for quick filtering
-    output_df['Has_Position_Issue'] = (df['pos_match'] == 0).map({True: 'YES', False: 'NO'})
-    output_df['Has_Genotype_Issue'] = (df['gt_match'] == 0).map({True: 'YES', False: 'NO'})
-    output_df['Has_Gene_Issue'] = (df['gene_changes'] > 0).map({True: 'YES', False: 'NO'})
-    output_df['Has_Worst_Consequence_Difference'] = df['has_worst_consequence_difference'].fillna('NO')
-    output_df['Has_Clinical_Change'] = (df['clin_sig_change'] != '').map({True: 'YES', False: 'NO'})
-    output_df['Has_Pathogenicity_Change'] = ((df['sift_change'] != '') | (df['polyphen_change'] != '')).map({True: 'YES', False: 'NO'})
-
-    print(f"Output dataframe created with {len(output_df)} rows")
-    print("Sample output:")
-    if len(output_df) > 0:
-        print(output_df[['Rank', 'Chromosome_hg19', 'Chromosome_hg38', 'Position_hg19', 'Gene_hg19', 'Priority_Score', 'Priority_Category']].head().to_string(index=False))
-    
-    return output_df
-
-
-def create_clinical_csv_output(df, output_dir, max_variants=10000):
-    """Create clinical evidence-focused CSV output for variant prioritization"""
-    
-    if len(df) == 0:
+    'hg19_worst_consequence': 'Worst_Consequence_hg19',
+    'hg38_worst_consequence': 'Worst_Consequence_hg38',
+    # Pathogenic predictions 
+    'hg19_sift': 'SIFT_hg19',
+    'hg38_sift': 'SIFT_hg38',
+    'hg19_polyphen': 'PolyPhen_hg19',
+    'hg38_polyphen': 'PolyPhen_hg38',
+    'sift_change': 'SIFT_Change',
+    'polyphen_change': 'PolyPhen_Change',
+    'impact_changes': 'Impact_Changes',
+    'pos_match': 'Position_Match',
+    'gt_match': 'Genotype_Match',
+    'mapping_status': 'Mapping_Status',
+    'priority_score': 'Priority_Score',
+    'priority_category': 'Priority_Category'
+}
+
+# result_df columns read by create_clinical_csv_output (mapped columns plus genotype sources)
+CLINICAL_CSV_SOURCE_COLUMNS = [
+    col for col in CLINICAL_CSV_COLUMNS if col not in ('Rank', 'GT_hg19', 'GT_hg38')
+] + ['source_alleles', 'bcftools_hg38_ref', 'bcftools_hg38_alt']
+
+def _configure_plot_style():
+    """Apply the configured plot style; matplotlib/seaborn are only imported when plots are drawn"""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    plt.style.use(PLOT_STYLE_CONFIG['style'])
+    sns.set_palette(PLOT_STYLE_CONFIG['seaborn_palette'])
+
+
+def _create_plots_in_worker(plot_df, output_dir):
+    """Render the prioritization plots (runs in a worker process, so imports happen here)"""
+    from visualization.plot_generator import PrioritizationPlotter
+    from config.visualization_config import PLOT_COLORS, FIGURE_CONFIG
+
+    _configure_plot_style()
+    plotter = PrioritizationPlotter(PLOT_COLORS, FIGURE_CONFIG)
+    plotter.create_all_plots(plot_df, output_dir)
+
+
+def create_clinical_csv_output(df, output_dir, max_variants=10000, output_format='csv', min_score=0):
+    """
+    Create clinical evidence-focused output for variant prioritization
+
+    Writes prioritized_variants.csv by default, prioritized_variants.parquet
+    (snappy-compressed, requires pyarrow) when output_format is 'parquet', or
+    prioritized_variants.xlsx (streamed, requires xlsxwriter) when it is 'xlsx'.
+    A positive min_score is applied before deduplication to the three key columns
+    only, so the full scored dataframe never has to be copied through a boolean mask.
+    """
+    
+    # Score threshold filters the dedup keys, not the full dataframe
+    keys = df[['source_chrom', 'source_pos', 'priority_score']]
+    if min_score > 0:
+        keys = keys[keys['priority_score'].to_numpy() >= min_score]
+    n_records = len(keys)
+    
+    if n_records == 0:
         print("No variants to output")
         return pd.DataFrame()
     
-    print(f"Creating clinical evidence-focused CSV output for top {min(len(df), max_variants):,} variants...")
+    print(f"Creating clinical evidence-focused CSV output for top {min(n_records, max_variants):,} variants...")
     
     # DEDUPLICATE by variant position (keep highest priority score per variant)
-    print(f"Deduplicating variants (before: {len(df):,} records)...")
-    df_dedup = df.loc[df.groupby(['source_chrom', 'source_pos'])['priority_score'].idxmax()]
-    duplicates_removed = len(df) - len(df_dedup)
+    print(f"Deduplicating variants (before: {n_records:,} records)...")
+    # Dedup and rank on the score column alone; only the kept rows are materialized in full
+    dedup_scores = keys.loc[keys.groupby(['source_chrom', 'source_pos'])['priority_score'].idxmax(), ['priority_score']]
+    n_unique = len(dedup_scores)
+    duplicates_removed = n_records - n_unique
     print(f"✓ Removed {duplicates_removed:,} duplicate transcript records")
-    print(f"✓ {len(df_dedup):,} unique variants remain")
-    
-    # Take top unique variants by priority score
-    output_df = df_dedup.head(max_variants).copy()
-    
-    # Add rank column
-    output_df['Rank'] = range(1, len(output_df) + 1)
-
-    # GT creation using direct data sources
-    output_df['GT_hg19'] = df['source_alleles'].fillna('').apply(lambda x: format_allele_for_display(str(x)) if x else '')
-
-    # For hg38, combine bcftools ref/alt
-    def create_hg38_gt(row):
-        ref = row.get('bcftools_hg38_ref', '')
-        alt = row.get('bcftools_hg38_alt', '')
-        if pd.notna(ref) and pd.notna(alt) and ref != '' and alt != '':
-            gt_string = f"{ref}/{alt}"
-            return format_allele_for_display(gt_string)
-        return ''
-
-    output_df['GT_hg38'] = df.apply(create_hg38_gt, axis=1)
-
-    
-    # Clinical evidence-focused column selection and renaming
-    column_mapping = {
-        'Rank': 'Rank',
-        'source_chrom': 'Chromosome_hg19',
-        'bcftools_hg38_chrom': 'Chromosome_hg38',
-        'source_pos': 'Position_hg19',
-        'bcftools_hg38_pos': 'Position_hg38_bcftools',
-        'liftover_hg38_pos': 'Position_hg38_CrossMap',
-        'GT_hg19': 'GT_hg19',
-        'GT_hg38': 'GT_hg38', 
-        'flip': 'Strand_Flip',      
-        'swap': 'Ref_Alt_Swap', 
-        'hg19_gene': 'Gene_hg19',
-        'hg38_gene': 'Gene_hg38',
-        'gene_changes': 'Gene_Changes',
-        'score_breakdown': 'Discordance_Summary',
-        'hg19_clin_sig_normalized': 'Clinical_Significance_hg19',
-        'hg38_clin_sig_normalized': 'Clinical_Significance_hg38',
-        'clin_sig_change': 'Clinical_Change_Direction',
-#        'hg19_impact': 'Impact_hg19',
-#        'hg38_impact': 'Impact_hg38',
-        'hg19_transcript_count': 'Tx_Count_hg19',
-        'hg38_transcript_count': 'Tx_Count_hg38',
-        # MANE information
-        'hg38_mane_flag': 'MANE_Flag_hg38',
-        'hg38_mane_transcript_id': 'MANE_Transcript_ID_hg38',
-        'hg38_mane_details': 'MANE_Details_hg38',
-        'hg19_mane_transcript_id': 'MANE_Transcript_ID_hg19',
-        'hg19_mane_details': 'MANE_Details_hg19',
-        # Canonical transcripts
-        'hg19_canonical_transcript': 'CANONICAL_transcript_hg19',
-        'hg38_canonical_transcript': 'CANONICAL_transcript_hg38',
-        # Priority transcript selection
-        'transcript_crossbuild_status': 'Transcript_CrossBuild_Status',
-        'priority_transcript_crossbuild': 'Priority_Transcript_CrossBuild',
-
-        # Priority transcript HGVS analysis
-        'priority_hgvsc_hg19': 'HGVS_c_hg19',
-        'priority_hgvsc_hg38': 'HGVS_c_hg38',
-        'priority_hgvsp_hg19': 'HGVS_p_hg19',
-        'priority_hgvsp_hg38': 'HGVS_p_hg38',
-        'priority_hgvsc_concordance': 'HGVS_c_Concordance',
-        'priority_hgvsp_concordance': 'HGVS_p_Concordance',
-        # Matched transcript analysis
-        'has_worst_consequence_difference': 'Has_Worst_Consequence_Difference',
-        'hg19_worst_consequence_tx_is_priority': 'Worst_Consequence_Tx_Is_Priority_hg19',
-        'hg38_worst_consequence_tx_is_priority': 'Worst_Consequence_Tx_Is_Priority_hg38',
-        'priority_consequence_hg19': 'Consequence_hg19',
-        'priority_consequence_hg38': 'Consequence_hg38',
-        'consequence_relationship': 'Consequence_Relationship',
-        'consequence_change': 'Consequence_Change',
-        # Worst consequence analysis
-        'hg19_worst_consequence': 'Worst_Consequence_hg19',
-        'hg38_worst_consequence': 'Worst_Consequence_hg38',
-        # Pathogenic predictions 
-        'hg19_sift': 'SIFT_hg19',
-        'hg38_sift': 'SIFT_hg38',
-        'hg19_polyphen': 'PolyPhen_hg19',
-        'hg38_polyphen': 'PolyPhen_hg38',
-        'sift_change': 'SIFT_Change',
-        'polyphen_change': 'PolyPhen_Change',
-        'impact_changes': 'Impact_Changes',
-        'pos_match': 'Position_Match',
-        'gt_match': 'Genotype_Match',
-        'mapping_status': 'Mapping_Status',
-        'priority_score': 'Priority_Score',
-        'priority_category': 'Priority_Category'
+    print(f"✓ {n_unique:,} unique variants remain")
+    
+    # Take top unique variants by priority score (partial selection, no full sort)
+    top_scores = select_top_rows(dedup_scores, max_variants, 'priority_score')
+    output_df = df.loc[top_scores.index]
+    
+    # Derived columns: rank and genotypes (vectorized over the selected rows only)
+    hg38_ref = output_df['bcftools_hg38_ref']
+    hg38_alt = output_df['bcftools_hg38_alt']
+    has_hg38_alleles = (hg38_ref.notna() & hg38_alt.notna() & (hg38_ref != '') & (hg38_alt != '')).to_numpy()
+    hg38_gt = format_alleles_for_display(hg38_ref.astype(str) + '/' + hg38_alt.astype(str))
+    derived = {
+        'Rank': np.arange(1, len(output_df) + 1),
+        'GT_hg19': format_alleles_for_display(output_df['source_alleles']),
+        # For hg38, combine bcftools ref/alt
+        'GT_hg38': np.where(has_hg38_alleles, hg38_gt, '').astype(object),
     }
     
-    # Create output dataframe with renamed columns
-    output_columns = []
-    for old_col, new_col in column_mapping.items():
-        if old_col in output_df.columns:
-            output_df[new_col] = output_df[old_col]
-            output_columns.append(new_col)
+    # Collect output columns under their clinical names in a dict and build the dataframe once
+    columns = {}
+    for old_col, new_col in CLINICAL_CSV_COLUMNS.items():
+        if old_col in derived:
+            columns[new_col] = derived[old_col]
+        elif old_col in output_df.columns:
+            columns[new_col] = output_df[old_col]
     
     # Add clinical change indicator
-    if 'Clinical_Change_Direction' in output_columns:
-        output_df['Has_Clinical_Change'] = output_df['Clinical_Change_Direction'].apply(
-            lambda x: 'YES' if x and x != '' and 'STABLE_' not in str(x) else 'NO'
+    if 'Clinical_Change_Direction' in columns:
+        clinical_change = columns['Clinical_Change_Direction'].fillna('').astype(str)
+        columns['Has_Clinical_Change'] = yes_no_flags(
+            (clinical_change != '') & ~clinical_change.str.contains('STABLE_', regex=False)
         )
-        output_columns.append('Has_Clinical_Change')
     
     # Add impact change indicator
-    if 'Impact_hg19' in output_columns and 'Impact_hg38' in output_columns:
-        output_df['Has_Impact_Change'] = (output_df['Impact_hg19'] != output_df['Impact_hg38']).apply(
-            lambda x: 'YES' if x else 'NO'
-        )
-        output_columns.append('Has_Impact_Change')
+    if 'Impact_hg19' in columns and 'Impact_hg38' in columns:
+        columns['Has_Impact_Change'] = yes_no_flags(columns['Impact_hg19'] != columns['Impact_hg38'])
     
     # Add consequence change indicator based on relationship type
-    if 'Consequence_Relationship' in output_columns:
-        output_df['Has_Consequence_Change'] = output_df['Consequence_Relationship'].apply(
-            lambda x: 'YES' if x in ['disjoint_consequences', 'partial_overlap_consequences', 'hg19_subset_of_hg38', 'hg38_subset_of_hg19'] else 'NO'
-        )
-        output_columns.append('Has_Consequence_Change')
+    if 'Consequence_Relationship' in columns:
+        columns['Has_Consequence_Change'] = yes_no_flags(columns['Consequence_Relationship'].isin(
+            ['disjoint_consequences', 'partial_overlap_consequences', 'hg19_subset_of_hg38', 'hg38_subset_of_hg19']
+        ))
     
-    # Select only the columns we want in the final output
-    final_df = output_df[output_columns].copy()
+    # copy=False: renamed columns share the selected rows' data instead of being duplicated
+    final_df = pd.DataFrame(columns, index=output_df.index, copy=False)
     
-    # Clean up data for clinical compatibility
-    final_df = final_df.fillna('')
-    
-    # Convert numeric columns to appropriate types
+    # Convert numeric columns to appropriate types (smallest integer dtype when already integral)
     numeric_columns = ['Priority_Score', 'Transcript_Changes', 'Gene_Changes', 'Impact_Changes']
     for col in numeric_columns:
         if col in final_df.columns:
             final_df[col] = pd.to_numeric(final_df[col], errors='coerce').fillna(0)
+    for col in numeric_columns + CLINICAL_CSV_INTEGER_COLUMNS:
+        if col in final_df.columns and pd.api.types.is_integer_dtype(final_df[col]):
+            final_df[col] = pd.to_numeric(final_df[col], downcast='integer')
+    
+    if output_format == 'parquet':
+        # Binary columnar output keeps native nulls; categoricals are dictionary-encoded
+        parquet_df = final_df.copy()
+        for col in PARQUET_CATEGORICAL_COLUMNS:
+            if col in parquet_df.columns:
+                parquet_df[col] = parquet_df[col].astype('category')
+        
+        output_file = output_dir / 'prioritized_variants.parquet'
+        parquet_df.to_parquet(output_file, engine='pyarrow', compression='snappy', index=False)
+        final_df = fill_missing_blank(final_df)
+        
+        report_lines = [f"✓ Clinical evidence Parquet saved to: {output_file}"]
+    elif output_format == 'xlsx':
+        final_df = categorize_output_columns(fill_missing_blank(final_df))
+        
+        # Streamed row by row (xlsxwriter constant_memory mode)
+        output_file = output_dir / 'prioritized_variants.xlsx'
+        write_xlsx(final_df, output_file)
+        
+        report_lines = [f"✓ Clinical evidence Excel workbook saved to: {output_file}"]
+    else:
+        # Clean up data for clinical compatibility
+        final_df = categorize_output_columns(fill_missing_blank(final_df))
+        
+        # Save to CSV
+        output_file = output_dir / 'prioritized_variants.csv'
+        write_csv(final_df, output_file)
+        
+        report_lines = [f"✓ Clinical evidence CSV saved to: {output_file}"]
+    report_lines.append(f"  - Total variants: {len(final_df):,}")
+    report_lines.append(f"  - Columns: {len(final_df.columns)}")
     
-    # Save to CSV
-    output_file = output_dir / 'prioritized_variants.csv'
-    final_df.to_csv(output_file, index=False)
-    
-    print(f"✓ Clinical evidence CSV saved to: {output_file}")
-    print(f"  - Total variants: {len(final_df):,}")
-    print(f"  - Columns: {len(final_df.columns)}")
-    
-    # Print priority distribution
+    # Priority distribution, printed with the report above in one write
+    # (this runs on the main thread while the plot process may also be writing to stdout)
     if 'Priority_Category' in final_df.columns:
-        category_counts = final_df['Priority_Category'].value_counts()
-        print("  - Priority distribution:")
-        for category, count in category_counts.items():
-            print(f"    {category}: {count:,}")
+        category_counts = count_categories(final_df['Priority_Category'])
+        report_lines.append("  - Priority distribution:")
+        report_lines += [f"    {category}: {count:,}" for category, count in category_counts.items() if count > 0]
+    sys.stdout.write('\n'.join(report_lines) + '\n')
     
     return final_df
 
 
-def create_summary_statistics(df_full, df_excel, output_dir):
-    """Create summary statistics file with clinical evidence-driven analysis details for FULL dataset"""
+def export_scored_dataset(df, output_dir):
+    """Write every scored variant to scored_variants.parquet (zstd-compressed, requires pyarrow)"""
+    output_file = output_dir / 'scored_variants.parquet'
+    try:
+        df.to_parquet(output_file, engine='pyarrow', compression='zstd', index=False)
+    except (TypeError, ValueError) as e:
+        # Arrow type/conversion errors: mixed-type object columns cannot be stored
+        output_file.unlink(missing_ok=True)
+        print(f"Warning: Could not write scored dataset ({e})")
+        return
+    print(f"✓ Scored dataset saved to: {output_file}")
+
+
+def create_summary_statistics(df_full, df_excel, output_dir, priority_counts=None):
+    """
+    Create summary statistics file with clinical evidence-driven analysis details for FULL dataset
+
+    priority_counts: optional {category: count} for df_full (computed here when omitted)
+    """
     print("Creating summary statistics...")
     
     summary_file = output_dir / 'variant_prioritization_summary.txt'
     
-    with open(summary_file, 'w') as f:
-        f.write("Variant Prioritization Summary - Clinical Evidence-Driven Analysis\n")
-        f.write("=" * 70 + "\n\n")
-        
-        f.write("DATASET OVERVIEW:\n")
-        f.write("-" * 20 + "\n")
-        f.write(f"Total discordant variants analyzed: {len(df_full):,}\n")
-        f.write(f"Variants included in Excel output: {len(df_excel):,}\n\n")
-        
-        # PRIORITY CATEGORY DISTRIBUTION
-        f.write("VARIANT PRIORITIZATION:\n")
-        f.write("-" * 25 + "\n")
-        if len(df_full) > 0:
-            category_counts = df_full['priority_category'].value_counts()
-            f.write("Priority category distribution:\n")
-            for category, count in category_counts.items():
-                pct = count / len(df_full) * 100
-                f.write(f"  {category}: {count:,} ({pct:.1f}%)\n")
-        f.write("\n")
-        
-        # CLINICAL SIGNIFICANCE TRANSITION ANALYSIS (UPDATED - removed redundant line)
-        f.write("CLINICAL SIGNIFICANCE TRANSITIONS:\n")
-        f.write("-" * 40 + "\n")
-        if len(df_full) > 0 and 'hg19_clin_sig_normalized' in df_full.columns:
-            # Stable annotations
-            stable_variants = df_full[df_full['hg19_clin_sig_normalized'] == df_full['hg38_clin_sig_normalized']]
-            f.write(f"Stable annotations: {len(stable_variants):,} variants\n")
-            
-            stable_counts = stable_variants['hg19_clin_sig_normalized'].value_counts()
-            for category in ['PATHOGENIC', 'BENIGN', 'VUS', 'RISK', 'DRUG_RESPONSE', 'PROTECTIVE', 'OTHER', 'NONE']:
-                if category in stable_counts:
-                    f.write(f"  Stable {category}: {stable_counts[category]:,}\n")
+    # Dataset size, used by every section
+    n_full = len(df_full)
+    
+    # One clinical transition matrix (rows=hg19, columns=hg38) shared by every clinical section
+    has_clin_sig = 'hg19_clin_sig_normalized' in df_full.columns
+    if has_clin_sig:
+        clin_categories = NORMALIZED_CLINICAL_CATEGORIES
+        clin_index = {category: i for i, category in enumerate(clin_categories)}
+        clin_matrix = clinical_transition_matrix(df_full['hg19_clin_sig_normalized'],
+                                                 df_full['hg38_clin_sig_normalized'])
+        stable_clin_counts = np.diag(clin_matrix)
+        stable_clin_total = int(stable_clin_counts.sum())
+        # Per-build totals are the matrix row (hg19) and column (hg38) sums
+        hg19_clin_totals = clin_matrix.sum(axis=1)
+        hg38_clin_totals = clin_matrix.sum(axis=0)
+    
+    out = []
+    out.append("Variant Prioritization Summary - Clinical Evidence-Driven Analysis\n")
+    out.append("=" * 70 + "\n\n")
+    
+    out.append("DATASET OVERVIEW:\n")
+    out.append("-" * 20 + "\n")
+    out.append(f"Total discordant variants analyzed: {n_full:,}\n")
+    out.append(f"Variants included in Excel output: {len(df_excel):,}\n\n")
+    
+    # PRIORITY CATEGORY DISTRIBUTION
+    out.append("VARIANT PRIORITIZATION:\n")
+    out.append("-" * 25 + "\n")
+    if n_full > 0:
+        category_counts = priority_counts if priority_counts is not None else count_categories(df_full['priority_category'])
+        # Unbox counts and percentages to Python numbers once (tolist) before the formatting loop
+        counts = np.array(list(category_counts.values()))
+        pcts = np.divide(counts, n_full) * 100
+        out.append("Priority category distribution:\n")
+        out.extend(f"  {category}: {count:,} ({pct:.1f}%)\n"
+                   for category, count, pct in zip(category_counts, counts.tolist(), pcts.tolist()) if count > 0)
+    out.append("\n")
+    
+    # CLINICAL SIGNIFICANCE TRANSITION ANALYSIS (UPDATED - removed redundant line)
+    out.append("CLINICAL SIGNIFICANCE TRANSITIONS:\n")
+    out.append("-" * 40 + "\n")
+    if n_full > 0 and has_clin_sig:
+        # Stable annotations (matrix diagonal)
+        out.append(f"Stable annotations: {stable_clin_total:,} variants\n")
+        
+        for category, count in zip(clin_categories, stable_clin_counts.tolist()):
+            if count > 0:
+                out.append(f"  Stable {category}: {count:,}\n")
+        
+        # Directional changes (hg19→hg38)
+        changing_clin_total = n_full - stable_clin_total
+        out.append(f"\nClinical significance transitions (hg19→hg38): {changing_clin_total:,} variants\n")
+        
+        # Show specific directional transitions (observed off-diagonal cells)
+        if changing_clin_total > 0:
+            transition_counts = {
+                (hg19_cat, hg38_cat): int(clin_matrix[i, j])
+                for hg19_cat, i in clin_index.items() for hg38_cat, j in clin_index.items()
+                if i != j and clin_matrix[i, j] > 0
+            }
             
-            # Directional changes (hg19→hg38)
-            changing_variants = df_full[df_full['hg19_clin_sig_normalized'] != df_full['hg38_clin_sig_normalized']]
-            f.write(f"\nClinical significance transitions (hg19→hg38): {len(changing_variants):,} variants\n")
+            # Critical transitions first
+            critical_transitions = [
+                ('BENIGN', 'PATHOGENIC'),
+                ('PATHOGENIC', 'BENIGN'), 
+                ('VUS', 'PATHOGENIC'),
+                ('PATHOGENIC', 'VUS')
+            ]
             
-            # Show specific directional transitions
-            if len(changing_variants) > 0:
-                transition_counts = changing_variants.groupby(['hg19_clin_sig_normalized', 'hg38_clin_sig_normalized']).size()
-                
-                # Critical transitions first
-                critical_transitions = [
-                    ('BENIGN', 'PATHOGENIC'),
-                    ('PATHOGENIC', 'BENIGN'), 
-                    ('VUS', 'PATHOGENIC'),
-                    ('PATHOGENIC', 'VUS')
-                ]
-                
-                for hg19_cat, hg38_cat in critical_transitions:
-                    if (hg19_cat, hg38_cat) in transition_counts:
-                        count = transition_counts[(hg19_cat, hg38_cat)]
-                        f.write(f"  {hg19_cat}→{hg38_cat}: {count:,} variants (critical)\n")
-                
-                # Other transitions
-                other_transitions = [(hg19, hg38) for hg19, hg38 in transition_counts.index 
-                                   if (hg19, hg38) not in critical_transitions]
-                
-                for hg19_cat, hg38_cat in other_transitions:
+            for hg19_cat, hg38_cat in critical_transitions:
+                if (hg19_cat, hg38_cat) in transition_counts:
                     count = transition_counts[(hg19_cat, hg38_cat)]
-                    f.write(f"  {hg19_cat}→{hg38_cat}: {count:,} variants\n")
-        f.write("\n")
-        
-        # IMPACT LEVEL TRANSITION ANALYSIS
-        f.write("IMPACT LEVEL TRANSITIONS:\n")
-        f.write("-" * 30 + "\n")
-        if len(df_full) > 0:
-            # Stable impact levels
-            stable_impact = df_full[df_full['hg19_impact'] == df_full['hg38_impact']]
-            f.write(f"Variants with stable impact: {len(stable_impact):,} ({len(stable_impact)/len(df_full)*100:.1f}%)\n")
+                    out.append(f"  {hg19_cat}→{hg38_cat}: {count:,} variants (critical)\n")
             
-            # Impact transitions (hg19→hg38)
-            changing_impact = df_full[df_full['hg19_impact'] != df_full['hg38_impact']]
-            if len(changing_impact) > 0:
-                f.write(f"Impact level transitions (hg19→hg38): {len(changing_impact):,} variants\n")
-                
-                impact_transition_counts = changing_impact.groupby(['hg19_impact', 'hg38_impact']).size()
-                for (hg19_impact, hg38_impact), count in impact_transition_counts.items():
-                    f.write(f"  {hg19_impact}→{hg38_impact}: {count:,} variants\n")
-            else:
-                f.write(f"Impact level transitions (hg19→hg38): 0 variants\n")
-        f.write("\n")
-
-        # CLINICAL DATA COVERAGE ASSESSMENT (UPDATED - build-specific table)
-        f.write("CLINICAL DATA COVERAGE:\n")
-        f.write("-" * 25 + "\n")
-        if len(df_full) > 0:
-            # Total clinical annotations
-            if 'hg19_clin_sig_normalized' in df_full.columns:
-                has_hg19_clin = df_full['hg19_clin_sig_normalized'] != 'NONE'
-                has_hg38_clin = df_full['hg38_clin_sig_normalized'] != 'NONE'
-                has_any_clin = has_hg19_clin | has_hg38_clin
-                total_with_clin = has_any_clin.sum()
-                f.write(f"Total variants with clinical annotations: {total_with_clin:,} ({total_with_clin/len(df_full)*100:.1f}%)\n\n")
-            
-            # Pathogenicity predictions
-            has_sift = (df_full['hg19_sift'] != '') | (df_full['hg38_sift'] != '')
-            has_polyphen = (df_full['hg19_polyphen'] != '') | (df_full['hg38_polyphen'] != '')
-            has_predictions = has_sift | has_polyphen
-            pred_count = has_predictions.sum()
-            f.write(f"Variants with pathogenicity predictions: {pred_count:,} ({pred_count/len(df_full)*100:.1f}%)\n\n")
-            
-            # Clinical evidence distribution by build (TABLE FORMAT)
-            if 'hg19_clin_sig_normalized' in df_full.columns:
-                f.write("Clinical evidence distribution by build:\n")
-                f.write(f"{'Category':<15} {'hg19':<8} {'hg38':<8}\n")
-                f.write("-" * 32 + "\n")
-                
-                categories = ['PATHOGENIC', 'BENIGN', 'VUS', 'RISK', 'DRUG_RESPONSE', 'PROTECTIVE', 'OTHER', 'NONE']
-                hg19_counts = df_full['hg19_clin_sig_normalized'].value_counts()
-                hg38_counts = df_full['hg38_clin_sig_normalized'].value_counts()
-                
-                for category in categories:
-                    hg19_count = hg19_counts.get(category, 0)
-                    hg38_count = hg38_counts.get(category, 0)
-                    f.write(f"{category:<15} {hg19_count:<8} {hg38_count:<8}\n")
-                
-                f.write("-" * 32 + "\n")
-                f.write(f"{'Total':<15} {len(df_full):<8} {len(df_full):<8}\n")
-        f.write("\n")
-        
-        # FUNCTIONAL ISSUE BREAKDOWN
-        f.write("FUNCTIONAL DISCORDANCES:\n")
-        f.write("-" * 25 + "\n")
-        if len(df_full) > 0:
-            gene_issues = (df_full['gene_changes'] > 0).sum()
-            impact_issues = (df_full['impact_changes'] > 0).sum()
+            # Other transitions
+            other_transitions = [(hg19, hg38) for hg19, hg38 in sorted(transition_counts)
+                               if (hg19, hg38) not in critical_transitions]
             
-            f.write(f"Gene annotation changes: {gene_issues:,} variants\n")
-            f.write(f"Impact level changes: {impact_issues:,} variants\n")
-        f.write("\n")
-        
-        # SPECIFIC TRANSITION MATRICES
-        f.write("KEY CLINICAL SIGNIFICANCE TRANSITIONS:\n")
-        f.write("-" * 40 + "\n")
-        if len(df_full) > 0 and 'hg19_clin_sig_normalized' in df_full.columns:
-            transition_matrix = pd.crosstab(df_full['hg19_clin_sig_normalized'], df_full['hg38_clin_sig_normalized'], 
-                                          rownames=['hg19'], colnames=['hg38'])
+            for hg19_cat, hg38_cat in other_transitions:
+                count = transition_counts[(hg19_cat, hg38_cat)]
+                out.append(f"  {hg19_cat}→{hg38_cat}: {count:,} variants\n")
+    out.append("\n")
+    
+    # IMPACT LEVEL TRANSITION ANALYSIS
+    out.append("IMPACT LEVEL TRANSITIONS:\n")
+    out.append("-" * 30 + "\n")
+    if n_full > 0:
+        # Impact transition counts from int8-encoded impact levels (single bincount pass)
+        n_levels = max(IMPACT_NUMERIC_VALUES.values()) + 1
+        # Scored frames carry the encoded levels; encode the labels for frames that don't
+        hg19_codes, hg38_codes = (
+            (df_full[f'{build}_impact_numeric'] if f'{build}_impact_numeric' in df_full.columns
+             else encode_impact_levels(df_full[f'{build}_impact'])).to_numpy(dtype=np.intp)
+            for build in ('hg19', 'hg38')
+        )
+        impact_matrix = np.bincount(hg19_codes * n_levels + hg38_codes,
+                                    minlength=n_levels * n_levels).reshape(n_levels, n_levels)
+
+        # Stable impact levels
+        stable_impact_count = int(np.trace(impact_matrix))
+        out.append(f"Variants with stable impact: {stable_impact_count:,} ({stable_impact_count / n_full * 100:.1f}%)\n")
+
+        # Impact transitions (hg19→hg38), listed in impact name order
+        changing_impact_count = n_full - stable_impact_count
+        if changing_impact_count > 0:
+            out.append(f"Impact level transitions (hg19→hg38): {changing_impact_count:,} variants\n")
+
+            impact_labels = sorted((decode_impact_level(code), code) for code in range(n_levels))
+            for hg19_impact, hg19_code in impact_labels:
+                for hg38_impact, hg38_code in impact_labels:
+                    count = impact_matrix[hg19_code, hg38_code]
+                    if hg19_code != hg38_code and count > 0:
+                        out.append(f"  {hg19_impact}→{hg38_impact}: {count:,} variants\n")
+        else:
+            out.append(f"Impact level transitions (hg19→hg38): 0 variants\n")
+    out.append("\n")
+
+    # CLINICAL DATA COVERAGE ASSESSMENT (UPDATED - build-specific table)
+    out.append("CLINICAL DATA COVERAGE:\n")
+    out.append("-" * 25 + "\n")
+    if n_full > 0:
+        # Total clinical annotations
+        if has_clin_sig:
+            total_with_clin = n_full - int(clin_matrix[clin_index['NONE'], clin_index['NONE']])
+            out.append(f"Total variants with clinical annotations: {total_with_clin:,} ({total_with_clin / n_full * 100:.1f}%)\n\n")
+        
+        # Pathogenicity predictions (single presence matrix: SIFT hg19/hg38, PolyPhen hg19/hg38);
+        # anything but an empty string counts as present, missing values included
+        prediction_columns = ['hg19_sift', 'hg38_sift', 'hg19_polyphen', 'hg38_polyphen']
+        has_prediction_matrix = df_full[prediction_columns].ne('').to_numpy(dtype=bool, na_value=True)
+        pred_count = has_prediction_matrix.any(axis=1).sum()
+        out.append(f"Variants with pathogenicity predictions: {pred_count:,} ({pred_count / n_full * 100:.1f}%)\n\n")
+        
+        # Clinical evidence distribution by build (TABLE FORMAT)
+        if has_clin_sig:
+            out.append("Clinical evidence distribution by build:\n")
+            out.append(f"{'Category':<15} {'hg19':<8} {'hg38':<8}\n")
+            out.append("-" * 32 + "\n")
             
-            # Show key transitions
-            key_categories = ['PATHOGENIC', 'BENIGN', 'VUS', 'NONE']
-            f.write("Transition matrix (rows=hg19, columns=hg38):\n")
-            f.write(f"{'':12}")
-            for cat in key_categories:
-                if cat in transition_matrix.columns:
-                    f.write(f"{cat:>12}")
-            f.write("\n")
+            for category, hg19_count, hg38_count in zip(clin_categories, hg19_clin_totals.tolist(),
+                                                        hg38_clin_totals.tolist()):
+                out.append(f"{category:<15} {hg19_count:<8} {hg38_count:<8}\n")
             
-            for hg19_cat in key_categories:
-                if hg19_cat in transition_matrix.index:
-                    f.write(f"{hg19_cat:12}")
-                    for hg38_cat in key_categories:
-                        if hg38_cat in transition_matrix.columns:
-                            value = transition_matrix.loc[hg19_cat, hg38_cat] if hg38_cat in transition_matrix.columns else 0
-                            f.write(f"{value:>12}")
-                    f.write("\n")
-        f.write("\n")
-        
-        # QUALITY RECOMMENDATIONS
-        f.write("CROSSBUILD VARIANT COMPARISON:\n")
-        f.write("-" * 35 + "\n")
-        
-        f.write("CRITICAL VARIANTS:\n")
-        f.write("• HGVS nomenclature mismatches on priority transcript (clinician #1 priority)\n")
-        f.write("• Major clinical significance changes (PATHOGENIC↔BENIGN)\n")
-        
-        f.write("MODERATE PRIORITY VARIANTS:\n")
-        f.write("• Priority transcript unavailable in one build\n")
-        f.write("• Pathogenic↔VUS clinical significance changes\n")
-        f.write("• Serious functional consequence differences\n")
-        
-        f.write("LOW PRIORITY VARIANTS:\n")
-        f.write("• VUS↔Benign clinical significance changes\n")
-        f.write("• Pathogenicity prediction changes (SIFT/PolyPhen)\n")
-        f.write("• Gene symbol or impact level differences\n")
-        f.write("• Technical liftover issues\n")
-        
-        f.write("CONCORDANT VARIANTS:\n")
-        f.write("• Perfect MANE transcript match with identical HGVS nomenclature\n")
-        f.write("• Consistent clinical annotations\n")
-        f.write("• No review required\n\n")
-        
-        # SCORING METHODOLOGY
-        f.write("VARIANT DISCREPANCY SCORING METHODOLOGY:\n")
-        f.write("-" * 45 + "\n")
-        f.write("PRIORITY TRANSCRIPT-BASED PRIORITIZATION:\n")
-        f.write("HGVS concordance on priority transcript drives prioritization.\n")
-        f.write("MANE-first transcript selection ensures clinical standard compliance.\n")
-        f.write("VUS and missing data de-prioritized (less clinically actionable).\n\n")
-        
-        f.write("PRIORITY CATEGORIES (4-Category System):\n")
-        f.write("• CRITICAL: HGVS mismatches on priority transcript (100+ points)\n")
-        f.write("            OR major clinical significance changes (Pathogenic↔Benign)\n")
-        f.write("• MODERATE: Priority transcript unavailable OR moderate clinical changes (60-99 points)\n")
-        f.write("• LOW: Minor changes and prediction differences (20-59 points)\n")
-        f.write("• CONCORDANT: Perfect priority transcript match with identical HGVS (0 points)\n\n")
-        
-        f.write("PRIORITY TRANSCRIPT-BASED SCORING WEIGHTS:\n")
-        f.write("• HGVS nomenclature mismatch (HGVSc): +100 points (CRITICAL)\n")
-        f.write("• Pathogenic↔Benign clinical changes: +90 points (CRITICAL)\n")
-        f.write("• HGVS protein mismatch (HGVSp): +50 points (CRITICAL)\n")
-        f.write("• Priority transcript unavailable: +60 points (MODERATE)\n")
-        f.write("• Pathogenic↔VUS changes: +40 points (MODERATE)\n")
-        f.write("• Serious functional differences: +35 points (MODERATE)\n")
-        f.write("• VUS↔Benign changes: +25 points (LOW)\n")
-        f.write("• Gene/impact changes: +15 points each (LOW)\n")
-        f.write("• Prediction changes: +10 points each (LOW)\n")
-        f.write("• Missing clinical data: +5 points (minimal penalty)\n\n")
-        
-        f.write("TRANSCRIPT SELECTION STRATEGY:\n")
-        f.write("• MANE Select transcripts (highest priority)\n")
-        f.write("• MANE Plus Clinical transcripts (fallback)\n")
-        f.write("• Canonical transcripts (when MANE unavailable)\n")
-        f.write("• First available matching transcript (last resort)\n")
-        f.write("• Same transcript used for comparison in both builds\n\n")
-        
-        f.write("CLINICAL EVIDENCE OVERRIDE:\n")
-        f.write("• 90% score reduction for benign variants (LOW/MODIFIER + benign evidence)\n")
-        f.write("• 2x score boost for pathogenic variants (HIGH impact or pathogenic evidence)\n")
-        f.write("• Maintains clinical context while prioritizing HGVS concordance\n\n")
-        
-        f.write("RATIONALE:\n")
-        f.write("HGVS nomenclature consistency is the top clinical priority for variant interpretation.\n")
-        f.write("Priority transcript approach ensures same transcript compared between builds.\n")
-        f.write("VUS-related changes de-prioritized as they are less clinically actionable.\n")
-        f.write("This approach focuses clinical review on variants most likely to affect patient care.\n\n")
+            out.append("-" * 32 + "\n")
+            out.append(f"{'Total':<15} {n_full:<8} {n_full:<8}\n")
+    out.append("\n")
+    
+    # FUNCTIONAL ISSUE BREAKDOWN
+    out.append("FUNCTIONAL DISCORDANCES:\n")
+    out.append("-" * 25 + "\n")
+    if n_full > 0:
+        # Both change counts in one pass over a (variants x 2) array
+        gene_issues, impact_issues = np.count_nonzero(
+            df_full[['gene_changes', 'impact_changes']].to_numpy() > 0, axis=0
+        )
         
-        f.write("DATA PROCESSING NOTES:\n")
-        f.write("• Priority transcript selected using MANE-first hierarchy\n")
-        f.write("• Clinical significance normalized to standard categories\n")
-        f.write("• Bounded scoring prevents category inflation\n")
+        out.append(f"Gene annotation changes: {gene_issues:,} variants\n")
+        out.append(f"Impact level changes: {impact_issues:,} variants\n")
+    out.append("\n")
+    
+    # SPECIFIC TRANSITION MATRICES
+    out.append("KEY CLINICAL SIGNIFICANCE TRANSITIONS:\n")
+    out.append("-" * 40 + "\n")
+    if n_full > 0 and has_clin_sig:
+        # Show key transitions, observed categories only (rows=hg19, columns=hg38)
+        key_categories = ['PATHOGENIC', 'BENIGN', 'VUS', 'NONE']
+        row_categories = [cat for cat in key_categories if hg19_clin_totals[clin_index[cat]] > 0]
+        column_categories = [cat for cat in key_categories if hg38_clin_totals[clin_index[cat]] > 0]
+        key_matrix = clin_matrix[np.ix_([clin_index[cat] for cat in row_categories],
+                                        [clin_index[cat] for cat in column_categories])]
+        
+        matrix_lines = [f"{'':12}" + ''.join(f"{cat:>12}" for cat in column_categories)]
+        matrix_lines += [f"{hg19_cat:12}" + ''.join(f"{value:>12}" for value in row)
+                         for hg19_cat, row in zip(row_categories, key_matrix.tolist())]
+        out.append("Transition matrix (rows=hg19, columns=hg38):\n")
+        out.append('\n'.join(matrix_lines) + '\n')
+    out.append("\n")
+    
+    # QUALITY RECOMMENDATIONS
+    out.append("CROSSBUILD VARIANT COMPARISON:\n")
+    out.append("-" * 35 + "\n")
+    
+    out.append("CRITICAL VARIANTS:\n")
+    out.append("• HGVS nomenclature mismatches on priority transcript (clinician #1 priority)\n")
+    out.append("• Major clinical significance changes (PATHOGENIC↔BENIGN)\n")
+    
+    out.append("MODERATE PRIORITY VARIANTS:\n")
+    out.append("• Priority transcript unavailable in one build\n")
+    out.append("• Pathogenic↔VUS clinical significance changes\n")
+    out.append("• Serious functional consequence differences\n")
+    
+    out.append("LOW PRIORITY VARIANTS:\n")
+    out.append("• VUS↔Benign clinical significance changes\n")
+    out.append("• Pathogenicity prediction changes (SIFT/PolyPhen)\n")
+    out.append("• Gene symbol or impact level differences\n")
+    out.append("• Technical liftover issues\n")
+    
+    out.append("CONCORDANT VARIANTS:\n")
+    out.append("• Perfect MANE transcript match with identical HGVS nomenclature\n")
+    out.append("• Consistent clinical annotations\n")
+    out.append("• No review required\n\n")
+    
+    # SCORING METHODOLOGY
+    out.append("VARIANT DISCREPANCY SCORING METHODOLOGY:\n")
+    out.append("-" * 45 + "\n")
+    out.append("PRIORITY TRANSCRIPT-BASED PRIORITIZATION:\n")
+    out.append("HGVS concordance on priority transcript drives prioritization.\n")
+    out.append("MANE-first transcript selection ensures clinical standard compliance.\n")
+    out.append("VUS and missing data de-prioritized (less clinically actionable).\n\n")
+    
+    out.append("PRIORITY CATEGORIES (4-Category System):\n")
+    out.append("• CRITICAL: HGVS mismatches on priority transcript (100+ points)\n")
+    out.append("            OR major clinical significance changes (Pathogenic↔Benign)\n")
+    out.append("• MODERATE: Priority transcript unavailable OR moderate clinical changes (60-99 points)\n")
+    out.append("• LOW: Minor changes and prediction differences (20-59 points)\n")
+    out.append("• CONCORDANT: Perfect priority transcript match with identical HGVS (0 points)\n\n")
+    
+    out.append("PRIORITY TRANSCRIPT-BASED SCORING WEIGHTS:\n")
+    out.append("• HGVS nomenclature mismatch (HGVSc): +100 points (CRITICAL)\n")
+    out.append("• Pathogenic↔Benign clinical changes: +90 points (CRITICAL)\n")
+    out.append("• HGVS protein mismatch (HGVSp): +50 points (CRITICAL)\n")
+    out.append("• Priority transcript unavailable: +60 points (MODERATE)\n")
+    out.append("• Pathogenic↔VUS changes: +40 points (MODERATE)\n")
+    out.append("• Serious functional differences: +35 points (MODERATE)\n")
+    out.append("• VUS↔Benign changes: +25 points (LOW)\n")
+    out.append("• Gene/impact changes: +15 points each (LOW)\n")
+    out.append("• Prediction changes: +10 points each (LOW)\n")
+    out.append("• Missing clinical data: +5 points (minimal penalty)\n\n")
+    
+    out.append("TRANSCRIPT SELECTION STRATEGY:\n")
+    out.append("• MANE Select transcripts (highest priority)\n")
+    out.append("• MANE Plus Clinical transcripts (fallback)\n")
+    out.append("• Canonical transcripts (when MANE unavailable)\n")
+    out.append("• First available matching transcript (last resort)\n")
+    out.append("• Same transcript used for comparison in both builds\n\n")
+    
+    out.append("CLINICAL EVIDENCE OVERRIDE:\n")
+    out.append("• 90% score reduction for benign variants (LOW/MODIFIER + benign evidence)\n")
+    out.append("• 2x score boost for pathogenic variants (HIGH impact or pathogenic evidence)\n")
+    out.append("• Maintains clinical context while prioritizing HGVS concordance\n\n")
+    
+    out.append("RATIONALE:\n")
+    out.append("HGVS nomenclature consistency is the top clinical priority for variant interpretation.\n")
+    out.append("Priority transcript approach ensures same transcript compared between builds.\n")
+    out.append("VUS-related changes de-prioritized as they are less clinically actionable.\n")
+    out.append("This approach focuses clinical review on variants most likely to affect patient care.\n\n")
+    
+    out.append("DATA PROCESSING NOTES:\n")
+    out.append("• Priority transcript selected using MANE-first hierarchy\n")
+    out.append("• Clinical significance normalized to standard categories\n")
+    out.append("• Bounded scoring prevents category inflation\n")
+
+    summary_file.write_text(''.join(out))
 
     print(f"✓ Summary statistics saved to: {summary_file}")
 
@@ -702,15 +748,19 @@ USAGE EXAMPLES:
 
 OUTPUT FILES:
     • prioritized_variants.csv - Clinical evidence-focused ranked variant list (top variants only)
+      (prioritized_variants.parquet / .xlsx with --output-format parquet / xlsx)
     • variant_prioritization_plots.png - Visual analysis plots (full dataset)
     • variant_prioritization_summary.txt - Detailed summary report (full dataset)
-    • variant_analysis_cache.pkl - Cached VEP analysis results (no scores)
+    • variant_analysis_cache.parquet - Cached VEP analysis results (no scores)
+      (variant_analysis_cache.pkl when pyarrow is not installed)
+    • variant_analysis_cache.scores.pkl - Cached score columns, tagged with the scoring fingerprint
 
 CACHING BEHAVIOR:
     • First run: Always calculates (no cache exists yet)
     • Subsequent runs: Uses cache for faster analysis
     • Use --force flag to recalculate VEP analysis and update cache
-    • Priority scores calculated on-the-fly for easy recalibration
+    • Cached priority scores are reused until the scoring code or config changes,
+      then recalculated from the cached VEP analysis (easy recalibration)
 
 CLINICAL EVIDENCE-DRIVEN SCORING:
     • 90% score reduction for benign variants (LOW/MODIFIER + benign evidence)
@@ -730,12 +780,20 @@ CLINICAL EVIDENCE-DRIVEN SCORING:
                        help='Maximum number of variants to output (default: 10000)')
     parser.add_argument('--min-score', '-s', type=int, default=1,
                        help='Minimum priority score to include (default: 1)')
+    parser.add_argument('--output-format', choices=['csv', 'parquet', 'xlsx'], default='csv',
+                       help='Format of the prioritized variant list (default: csv; parquet requires pyarrow, xlsx requires xlsxwriter)')
     parser.add_argument('--no-plots', action='store_true',
                        help='Skip plot generation (faster for large datasets)')
     parser.add_argument('--force', action='store_true',
                        help='Force recalculation of VEP analysis (ignore cache)')
+    parser.add_argument('--gpu', action='store_true',
+                       help='Run priority scoring on a CUDA GPU (requires numba; falls back to CPU)')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Worker processes for VEP analysis of variant chunks (default: 1, in-process)')
     parser.add_argument('--export-json', action='store_true',
                        help='Export structured results as JSON (optional)')
+    parser.add_argument('--export-scored-parquet', action='store_true',
+                       help='Also write every scored variant to scored_variants.parquet (optional, requires pyarrow)')
     parser.add_argument('--verbose', '-v', action='store_true',
                        help='Enable verbose output')
     
@@ -751,123 +809,151 @@ CLINICAL EVIDENCE-DRIVEN SCORING:
         output_dir = Path(args.output_dir)
         output_dir.mkdir(parents=True, exist_ok=True)
         
-        if args.verbose:
-            print(f"Database: {db_path}")
-            print(f"Output directory: {output_dir}")
-            print(f"Max variants: {args.max_variants:,}")
-            print(f"Min score threshold: {args.min_score}")
-            print(f"Force recalculation: {args.force}")
-        
-        # Connect to database
-        print("Connecting to database...")
-        conn = sqlite3.connect(db_path)
+        if args.output_format == 'parquet' and not PYARROW_AVAILABLE:
+            print("Warning: pyarrow is not installed, writing CSV output instead of Parquet")
+            args.output_format = 'csv'
         
-        # Check database contents
-        table_check = pd.read_sql_query("""
-        SELECT name FROM sqlite_master WHERE type='table'
-        """, conn)
-        
-        required_tables = ['comparison', 'hg19_vep', 'hg38_vep']
-        missing_tables = [table for table in required_tables if table not in table_check['name'].values]
-        
-        if missing_tables:
-            print(f"Error: Missing required tables: {missing_tables}")
-            print("Available tables:", table_check['name'].tolist())
-            conn.close()
-            return 1
+        if args.output_format == 'xlsx' and not XLSXWRITER_AVAILABLE:
+            print("Warning: xlsxwriter is not installed, writing CSV output instead of Excel")
+            args.output_format = 'csv'
         
-        # Set up caching
-        cache_file = output_dir / 'variant_analysis_cache.pkl'
+        if args.export_scored_parquet and not PYARROW_AVAILABLE:
+            print("Warning: pyarrow is not installed, skipping scored_variants.parquet")
+            args.export_scored_parquet = False
         
-        # Initialize variant processor
-        processor = VariantProcessor()
-        
-        print("\n" + "="*80)
-        print("CROSSBUILD ASSESSOR - VARIANT PRIORITIZATION")
-        print("="*80)
-        
-        # Process all variants (with caching and scoring)
-        result_df = processor.process_all_variants(
-            conn, 
-            cache_file=cache_file, 
-            force_recalculate=args.force
-        )
+        if args.verbose:
+            sys.stdout.write(
+                f"Database: {db_path}\n"
+                f"Output directory: {output_dir}\n"
+                f"Max variants: {args.max_variants:,}\n"
+                f"Min score threshold: {args.min_score}\n"
+                f"Force recalculation: {args.force}\n"
+            )
+        
+        # Connect to database (closed on every exit path, including errors)
+        print("Connecting to database...")
+        with closing(connect_read_only(db_path)) as conn:
+            
+            # Check database contents
+            missing_tables = find_missing_tables(conn, ['comparison', 'hg19_vep', 'hg38_vep'])
+            
+            if missing_tables:
+                print(f"Error: Missing required tables: {missing_tables}")
+                available_tables = [name for (name,) in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type='table'")]
+                print("Available tables:", available_tables)
+                return 1
+            
+            # Set up caching
+            cache_file = output_dir / 'variant_analysis_cache.pkl'
+            
+            # Initialize variant processor
+            processor = VariantProcessor(use_gpu=args.gpu, workers=args.workers)
+            
+            sys.stdout.write("\n" + "="*80 + "\nCROSSBUILD ASSESSOR - VARIANT PRIORITIZATION\n" + "="*80 + "\n")
+            
+            # Process all variants (with caching and scoring)
+            result_df = processor.process_all_variants(
+                conn, 
+                cache_file=cache_file, 
+                force_recalculate=args.force
+            )
+        # Database released here: everything below works on result_df only
         
         if len(result_df) == 0:
             print("\nNo discordant variants found for prioritization.")
-            conn.close()
             return 0
         
-        print(f"\n✓ Analysis completed: {len(result_df):,} total discordant variants found")
+        n_total = len(result_df)
+        print(f"\n✓ Analysis completed: {n_total:,} total discordant variants found")
 
-        # Filter by minimum score
+        # Filter by minimum score, keeping only the columns the clinical output reads
+        # (read-only downstream, so no defensive copies)
+        csv_columns = [col for col in CLINICAL_CSV_SOURCE_COLUMNS if col in result_df.columns]
+        csv_df = result_df[csv_columns]
+        n_passing = n_total
         if args.min_score > 0:
-            filtered_df = result_df[result_df['priority_score'] >= args.min_score].copy()
-            print(f"✓ Filtered by min score ({args.min_score}): {len(filtered_df):,} variants remain")
-        else:
-            filtered_df = result_df.copy()
-        
-        # Sort by priority score (descending)
-        filtered_df = filtered_df.sort_values('priority_score', ascending=False)
-
-        
-        # Create clinical evidence-focused CSV output
-        output_df = create_clinical_csv_output(filtered_df, output_dir, args.max_variants)
-        
-        # Generate plots (unless disabled)
-        if not args.no_plots and len(result_df) > 0:
-            try:
+            # Only count here; the threshold itself is applied to the dedup keys in the output step
+            n_passing = np.count_nonzero(result_df['priority_score'].to_numpy() >= args.min_score)
+            print(f"✓ Filtered by min score ({args.min_score}): {n_passing:,} variants remain")
+        
+        # Render the plots in a separate process (matplotlib is CPU-bound) while this one writes
+        # the clinical output, summary and JSON; the plot process receives only the columns it reads.
+        # Spawned rather than forked: forking after the numba/OpenMP thread pools have started
+        # can deadlock at interpreter exit
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as plot_executor:
+            plot_future = None
+            if not args.no_plots:
                 print("\nGenerating prioritization visualizations...")
-                from visualization.plot_generator import PrioritizationPlotter
-                from config.visualization_config import PLOT_COLORS, FIGURE_CONFIG
-                
-                plotter = PrioritizationPlotter(PLOT_COLORS, FIGURE_CONFIG)
-                plotter.create_all_plots(result_df, conn, output_dir)
+                plot_columns = [col for col in PLOT_SOURCE_COLUMNS if col in result_df.columns]
+                plot_future = plot_executor.submit(_create_plots_in_worker, result_df[plot_columns], output_dir)
+            
+            # Nothing passed the threshold: skip dedup, formatting and the file write entirely
+            if n_passing > 0:
+                output_df = create_clinical_csv_output(
+                    csv_df, output_dir, args.max_variants, args.output_format, args.min_score
+                )
+            else:
+                print("No variants passed the score threshold; skipping clinical output")
+                output_df = pd.DataFrame()
+            
+            # Priority distribution of the full dataset, shared by the summary file and JSON export
+            priority_counts = count_categories(result_df['priority_category'])
+            
+            # Create summary statistics using BOTH full dataset and CSV subset
+            create_summary_statistics(result_df, output_df, output_dir, priority_counts)
+            
+            # Optional JSON export
+            if args.export_json:
+                print("Exporting structured JSON data...")
+                calculator = SummaryDataCalculator()
+                priority_data = calculator.calculate_prioritization_summary(result_df, output_df, priority_counts)
                 
-            except ImportError as e:
-                print(f"Warning: Could not generate plots: {e}")
-                print("Install matplotlib and seaborn for visualization support")
-            except Exception as e:
-                print(f"Warning: Plot generation failed: {e}")
-        
-        # Create summary statistics using BOTH full dataset and CSV subset
-        create_summary_statistics(result_df, output_df, output_dir)
-        
-        # Optional JSON export
-        if args.export_json:
-            print("Exporting structured JSON data...")
-            calculator = SummaryDataCalculator()
-            priority_data = calculator.calculate_prioritization_summary(result_df, output_df)
+                json_file = output_dir / 'prioritization_results.json'
+                with open(json_file, 'w') as f:
+                    json.dump(priority_data, f, indent=2, default=str)
+                print(f"✓ JSON data exported to: {json_file}")
             
-            json_file = output_dir / 'prioritization_results.json'
-            with open(json_file, 'w') as f:
-                json.dump(priority_data, f, indent=2, default=str)
-            print(f"✓ JSON data exported to: {json_file}")
-        
-        conn.close()
-        
-        # Final summary
-        print("\n" + "="*80)
-        print("PRIORITIZATION COMPLETED SUCCESSFULLY")
-        print("="*80)
-        print(f"📁 Output directory: {output_dir}")
-        print(f"📊 Total variants analyzed: {len(result_df):,}")
-        print(f"📋 Variants in CSV output: {len(output_df):,}")
-        
-        if len(output_df) > 0:
+            # Optional full scored dataset (typed and columnar, for downstream tooling)
+            if args.export_scored_parquet:
+                export_scored_dataset(result_df, output_dir)
+            
+            # Plot failures are reported but never fail the run
+            if plot_future is not None:
+                try:
+                    plot_future.result()
+                except ImportError as e:
+                    print(f"Warning: Could not generate plots: {e}")
+                    print("Install matplotlib and seaborn for visualization support")
+                except Exception as e:
+                    print(f"Warning: Plot generation failed: {e}")
+        
+        # Final summary (assembled once, written in a single call)
+        n_output = len(output_df)
+        summary_lines = [COMPLETION_SUMMARY_TEMPLATE.format_map({
+            'output_dir': output_dir,
+            'total_analyzed': n_total,
+            'total_output': n_output
+        })]
+        
+        if n_output > 0:
             # Show priority category breakdown
-            priority_summary = output_df['Priority_Category'].value_counts()
-            print(f"\n🎯 Priority distribution:")
-            for category, count in priority_summary.items():
-                percentage = count / len(output_df) * 100
-                print(f"   {category}: {count:,} ({percentage:.1f}%)")
+            priority_summary = count_categories(output_df['Priority_Category'])
+            counts = np.array(list(priority_summary.values()))
+            percentages = np.divide(counts, n_output) * 100
+            summary_lines += ["", "🎯 Priority distribution:"]
+            summary_lines += [f"   {category}: {count:,} ({percentage:.1f}%)"
+                              for category, count, percentage in zip(priority_summary, counts.tolist(), percentages.tolist())
+                              if count > 0]
             
             # Show clinical changes
             if 'Has_Clinical_Change' in output_df.columns:
-                clinical_changes = (output_df['Has_Clinical_Change'] == 'YES').sum()
-                print(f"🔬 Clinical significance changes: {clinical_changes:,}")
+                clinical_changes = np.count_nonzero(output_df['Has_Clinical_Change'].to_numpy() == 'YES')
+                summary_lines.append(f"🔬 Clinical significance changes: {clinical_changes:,}")
         
-        print(f"\n✅ Review prioritized_variants.csv for clinical decision support")
+        summary_lines += ["", f"✅ Review prioritized_variants.{args.output_format} for clinical decision support"]
+        sys.stdout.write("\n".join(summary_lines) + "\n")
+        sys.stdout.flush()
         
     except KeyboardInterrupt:
         print("\n⚠️  Analysis interrupted by user")
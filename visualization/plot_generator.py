@@ -10,6 +10,8 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 
+from utils.clinical_utils import count_clinical_categories
+
 
 class PrioritizationPlotter:
     """Generate prioritization analysis plots with clinical evidence focus"""
@@ -30,7 +32,7 @@ class PrioritizationPlotter:
         # Build-specific colors (colorblind friendly)
         self.colors_builds = ['#1f77b4', '#ff7f0e']  # Blue for hg19, Orange for hg38
     
-    def create_all_plots(self, df, conn, output_dir):
+    def create_all_plots(self, df, output_dir):
         """Create enhanced visualization plots for variant prioritization analysis"""
         print("Creating enhanced prioritization visualizations...")
         
@@ -62,7 +64,7 @@ class PrioritizationPlotter:
         plt.show()
         
         # Print summary statistics
-        self._print_summary_statistics(df, conn)
+        self._print_summary_statistics(df)
     
     def _plot_clinical_evidence_by_build(self, df, ax):
         """Plot 1: Clinical evidence distribution by build (NEW)"""
@@ -76,8 +78,8 @@ class PrioritizationPlotter:
             
             if present_categories:
                 # Count occurrences in each build
-                hg19_counts = df['hg19_clin_sig_normalized'].value_counts()
-                hg38_counts = df['hg38_clin_sig_normalized'].value_counts()
+                hg19_counts = count_clinical_categories(df['hg19_clin_sig_normalized'])
+                hg38_counts = count_clinical_categories(df['hg38_clin_sig_normalized'])
                 
                 x_positions = np.arange(len(present_categories))
                 width = 0.35
@@ -287,8 +289,8 @@ class PrioritizationPlotter:
         print("4. Creating primary discordance types visualization...")
         
         if len(df) > 0:
-            df['discordance_primary'] = df['score_breakdown'].apply(self._categorize_discordance_primary)
-            discordance_counts = df['discordance_primary'].value_counts()
+            discordance_primary = df['score_breakdown'].apply(self._categorize_discordance_primary)
+            discordance_counts = discordance_primary.value_counts()
             
             # Order exactly following our BASE_SCORES hierarchy (high to low points)
             discordance_order = [
@@ -351,7 +353,7 @@ class PrioritizationPlotter:
         else:
             return 'Other Issues'
     
-    def _print_summary_statistics(self, df, conn):
+    def _print_summary_statistics(self, df):
         """Print enhanced summary statistics"""
         print("\n=== VISUALIZATION SUMMARY ===")
         print(f"Total discordant variants analyzed: {len(df):,}")